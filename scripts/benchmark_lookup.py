@@ -0,0 +1,74 @@
+# Copyright (c) 2019 Works Applications Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares DoubleArrayLexicon.lookup with a lookup copying the rest of the
+input at every offset, over inputs of growing length.
+
+    $ python scripts/benchmark_lookup.py -r tests/resources/sudachi.json
+"""
+
+import argparse
+import time
+
+from sudachipy import dictionary
+
+
+def copying_lookup(lexicon, text, offset):
+    key = text[offset:]
+    for index, length in lexicon.trie.common_prefix_search(key, length=len(key)):
+        for word_id in lexicon.word_id_table.get(index):
+            yield word_id, length + offset
+
+
+def lookup_all(lookup, text):
+    n = 0
+    for offset in range(len(text)):
+        for _ in lookup(text, offset):
+            n += 1
+    return n
+
+
+def measure(lookup, text, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        lookup_all(lookup, text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='benchmark of DoubleArrayLexicon.lookup')
+    parser.add_argument('-r', dest='fpath_setting', metavar='file', help='the setting file in JSON format')
+    parser.add_argument('-s', dest='sentence', default='東京都に行った。', help='the sentence to be repeated')
+    parser.add_argument('-n', dest='repeat', type=int, default=3, help='the number of runs per size')
+    parser.add_argument('sizes', metavar='bytes', type=int, nargs='*',
+                        default=[100, 300, 1000, 3000, 10000, 30000, 100000],
+                        help='input sizes in bytes')
+    args = parser.parse_args()
+
+    lexicon = dictionary.Dictionary(config_path=args.fpath_setting).lexicon.lexicons[0]
+    sentence = args.sentence.encode('utf-8')
+
+    print('bytes\tcopying[s]\twindowed[s]\tratio')
+    for size in args.sizes:
+        text = (sentence * (size // len(sentence) + 1))[:size]
+        copying = measure(lambda t, o: copying_lookup(lexicon, t, o), text, args.repeat)
+        windowed = measure(lexicon.lookup, text, args.repeat)
+        print('{}\t{:.4f}\t{:.4f}\t{:.2f}'.format(size, copying, windowed, copying / windowed))
+
+
+if __name__ == '__main__':
+    main()
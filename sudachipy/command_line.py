@@ -13,7 +13,6 @@
 # limitations under the License.
 
 import argparse
-import fileinput
 import logging
 import os
 import sys
@@ -57,10 +56,19 @@ def _set_default_subparser(self, name, args=None):
 argparse.ArgumentParser.set_default_subparser = _set_default_subparser
 
 
+def _positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError('{} is not a positive integer'.format(value))
+    return number
+
+
 def run(tokenizer, mode, input_, print_all, stdot_logger, enable_dump):
-    for line in input_:
-        line = line.rstrip('\n')
-        for m in tokenizer.tokenize(line, mode, stdot_logger if enable_dump else None):
+    for ms in tokenizer.tokenize_stream(input_, mode, logger=stdot_logger if enable_dump else None):
+        for m in ms:
             list_info = [
                 m.surface(),
                 ",".join(m.part_of_speech()),
@@ -110,7 +118,8 @@ def _command_user_build(args, print_usage):
     dict_ = BinaryDictionary.from_system_dictionary(args.system_dic)
     with open(args.out_file, 'wb') as wf:
         wf.write(header.to_bytes())
-        builder = UserDictionaryBuilder(dict_.grammar, dict_.lexicon)
+        builder = UserDictionaryBuilder(dict_.grammar, dict_.lexicon, processes=args.processes,
+                                        streaming=args.streaming)
         builder.build(args.in_files, None, wf)
 
 
@@ -121,7 +130,7 @@ def _command_build(args, print_usage):
         SYSTEM_DICT_VERSION_2, int(time.time()), args.description)
     with open(args.out_file, 'wb') as wf, open(args.matrix_file, 'r') as rf:
         wf.write(header.to_bytes())
-        builder = DictionaryBuilder()
+        builder = DictionaryBuilder(processes=args.processes, streaming=args.streaming)
         builder.build(args.in_files, rf, wf)
 
 
@@ -158,8 +167,12 @@ def _command_tokenize(args, print_usage):
         else:
             dict_ = dictionary.Dictionary(config_path=args.fpath_setting)
         tokenizer_obj = dict_.create()
-        input_ = fileinput.input(args.in_files, openhook=fileinput.hook_encoded("utf-8"))
-        run(tokenizer_obj, mode, input_, print_all, stdout_logger, enable_dump)
+        if args.in_files:
+            for in_file in args.in_files:
+                with open(in_file, 'r', encoding='utf-8') as input_:
+                    run(tokenizer_obj, mode, input_, print_all, stdout_logger, enable_dump)
+        else:
+            run(tokenizer_obj, mode, sys.stdin, print_all, stdout_logger, enable_dump)
     finally:
         if args.fpath_out:
             output.close()
@@ -196,6 +209,10 @@ def main():
     required_named_bd = parser_bd.add_argument_group('required named arguments')
     required_named_bd.add_argument('-m', dest='matrix_file', metavar='file', required=True,
                                    help='connection matrix file with MeCab\'s matrix.def format')
+    parser_bd.add_argument('-j', dest='processes', type=_positive_int, default=1, metavar='N',
+                           help='the number of processes to parse the source files (default: 1)')
+    parser_bd.add_argument('--streaming', action='store_true',
+                           help='keep the words in temporary files to build a dictionary larger than the memory')
     parser_bd.add_argument("in_files", metavar="file", nargs=argparse.ONE_OR_MORE,
                            help='source files with CSV format (one of more)')
     parser_bd.set_defaults(handler=_command_build, print_usage=parser_bd.print_usage)
@@ -208,6 +225,10 @@ def main():
                             help='output file (default: user.dic)')
     parser_ubd.add_argument('-s', dest='system_dic', metavar='file', required=False,
                             help='system dictionary path (default: system core dictionary path)')
+    parser_ubd.add_argument('-j', dest='processes', type=_positive_int, default=1, metavar='N',
+                            help='the number of processes to parse the source files (default: 1)')
+    parser_ubd.add_argument('--streaming', action='store_true',
+                            help='keep the words in temporary files to build a dictionary larger than the memory')
     parser_ubd.add_argument("in_files", metavar="file", nargs=argparse.ONE_OR_MORE,
                             help='source files with CSV format (one or more)')
     parser_ubd.set_defaults(handler=_command_user_build, print_usage=parser_ubd.print_usage)
@@ -18,12 +18,14 @@ import warnings
 from importlib import import_module
 from importlib.util import find_spec
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 DEFAULT_RESOURCEDIR = Path(__file__).absolute().parent / 'resources'
 DEFAULT_SETTINGFILE = DEFAULT_RESOURCEDIR / 'sudachi.json'
 DEFAULT_RESOURCEDIR = DEFAULT_RESOURCEDIR.as_posix()
 DEFAULT_SETTINGFILE = DEFAULT_SETTINGFILE.as_posix()
+DEFAULT_WORD_INFO_CACHE_SIZE = 1024
+DEFAULT_RESULT_CACHE_DISK_SIZE = 1 << 20
 
 
 def get_absolute_dict_path(dict_type: str) -> str:
@@ -55,6 +57,12 @@ class _Settings(object):
     DICT_PATH_KEY = 'systemDict'
     CHAR_DEF_KEY = 'characterDefinitionFile'
     USER_DICT_PATH_KEY = 'userDict'
+    WORD_INFO_CACHE_SIZE_KEY = 'wordInfoCacheSize'
+    WORD_INFO_CACHE_PINNED_KEY = 'wordInfoCachePinnedWords'
+    RESULT_CACHE_SIZE_KEY = 'resultCacheSize'
+    RESULT_CACHE_PATH_KEY = 'resultCachePath'
+    RESULT_CACHE_DISK_SIZE_KEY = 'resultCacheDiskSize'
+    WORD_ID_INDEX_FILE_KEY = 'wordIdIndexFile'
 
     def __init__(self):
         self.__is_active = False
@@ -117,5 +125,24 @@ class _Settings(object):
             return [to_absolute_resource_path(self.resource_dir, path) for path in self.__dict_[key]]
         return []
 
+    def word_info_cache_size(self) -> int:
+        return self.__dict_.get(self.WORD_INFO_CACHE_SIZE_KEY, DEFAULT_WORD_INFO_CACHE_SIZE)
+
+    def word_info_cache_pinned_words(self) -> List[int]:
+        return self.__dict_.get(self.WORD_INFO_CACHE_PINNED_KEY, [])
+
+    def result_cache_size(self) -> int:
+        return self.__dict_.get(self.RESULT_CACHE_SIZE_KEY, 0)
+
+    def result_cache_path(self) -> Optional[str]:
+        path = self.__dict_.get(self.RESULT_CACHE_PATH_KEY)
+        return to_absolute_resource_path(self.resource_dir, path) if path else None
+
+    def result_cache_disk_size(self) -> int:
+        return self.__dict_.get(self.RESULT_CACHE_DISK_SIZE_KEY, DEFAULT_RESULT_CACHE_DISK_SIZE)
+
+    def use_word_id_index_file(self) -> bool:
+        return bool(self.__dict_.get(self.WORD_ID_INDEX_FILE_KEY, False))
+
 
 settings = _Settings()
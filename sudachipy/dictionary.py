@@ -12,6 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
+import json
+import os
+from typing import List
+
+import sudachipy
+
 from . import config
 from . import dictionarylib
 from .dictionarylib.binarydictionary import BinaryDictionary
@@ -19,6 +26,7 @@ from .dictionarylib.lexiconset import LexiconSet
 from .plugin.input_text import get_input_text_plugins
 from .plugin.oov import get_oov_plugins
 from .plugin.path_rewrite import get_path_rewrite_plugins
+from .resultcache import ResultCache
 from .tokenizer import Tokenizer
 
 
@@ -38,6 +46,7 @@ class Dictionary:
         self.path_rewrite_plugins = []
         self.dictionaries = []
         self.header = None
+        self.result_cache = None
         self._read_system_dictionary(config.settings.system_dict_path())
 
         # self.edit_connection_plugin = [InhibitConnectionPlugin()]
@@ -64,18 +73,81 @@ class Dictionary:
         for filename in config.settings.user_dict_paths():
             self._read_user_dictionary(filename)
 
+        self.lexicon.pin_word_info(config.settings.word_info_cache_pinned_words())
+
+        self._fingerprint = self._compute_fingerprint()
+        result_cache_size = config.settings.result_cache_size()
+        result_cache_path = config.settings.result_cache_path()
+        if result_cache_size or result_cache_path:
+            self.result_cache = ResultCache(result_cache_size, result_cache_path, self._fingerprint,
+                                            config.settings.result_cache_disk_size())
+
+    def _resource_paths(self) -> List[str]:
+        """ returns the paths of the resource files other than the dictionaries read in setting up """
+        settings = config.settings
+        paths = [settings.char_def_path()]
+
+        def find_files(value):
+            if isinstance(value, str):
+                path = config.to_absolute_resource_path(settings.resource_dir, value)
+                if os.path.isfile(path):
+                    paths.append(path)
+            elif isinstance(value, list):
+                for v in value:
+                    find_files(v)
+            elif isinstance(value, dict):
+                for v in value.values():
+                    find_files(v)
+
+        for key in settings.keys():
+            if key not in (settings.DICT_PATH_KEY, settings.USER_DICT_PATH_KEY, settings.RESULT_CACHE_PATH_KEY):
+                find_files(settings[key])
+        for p in self.input_text_plugins:
+            rewrite_def = getattr(p, 'rewrite_def', None)
+            if rewrite_def:
+                paths.append(rewrite_def)
+        return list(dict.fromkeys(os.path.abspath(path) for path in paths))
+
+    def _compute_fingerprint(self) -> str:
+        sha = hashlib.sha1()
+        sha.update('{}\n'.format(getattr(sudachipy, '__version__', '')).encode('utf-8'))
+        for dict_ in self.dictionaries:
+            header = dict_.header
+            sha.update('{}\t{}\t{}\n'.format(header.version, header.create_time, header.description).encode('utf-8'))
+        sha.update('\n'.join(config.settings.user_dict_paths()).encode('utf-8'))
+        settings = {key: config.settings[key] for key in config.settings.keys()}
+        sha.update(json.dumps(settings, sort_keys=True, default=str).encode('utf-8'))
+        for path in self._resource_paths():
+            with open(path, 'rb') as f:
+                sha.update('\n{}\n'.format(path).encode('utf-8'))
+                sha.update(f.read())
+        return sha.hexdigest()
+
+    def fingerprint(self) -> str:
+        """ returns the fingerprint of the dictionaries and the settings
+
+        It is computed from the version of SudachiPy, the headers of the
+        system and the user dictionaries, the user dictionary paths, the
+        settings and the contents of the other resource files like
+        char.def and rewrite.def, and is used as a part of the key of the
+        result cache.
+        """
+        return self._fingerprint
+
     def _read_system_dictionary(self, filename):
         if filename is None:
             raise ValueError("system dictionary is not specified")
-        dict_ = BinaryDictionary.from_system_dictionary(filename)
+        dict_ = BinaryDictionary.from_system_dictionary(
+            filename, word_id_index_file=config.settings.use_word_id_index_file())
         self.dictionaries.append(dict_)
         self.grammar = dict_.grammar
-        self.lexicon = LexiconSet(dict_.lexicon)
+        self.lexicon = LexiconSet(dict_.lexicon, config.settings.word_info_cache_size())
 
     def _read_user_dictionary(self, filename):
         if self.lexicon.is_full():
             raise ValueError('too many dictionaries')
-        dict_ = BinaryDictionary.from_user_dictionary(filename)
+        dict_ = BinaryDictionary.from_user_dictionary(
+            filename, word_id_index_file=config.settings.use_word_id_index_file())
         self.dictionaries.append(dict_)
         user_lexicon = dict_.lexicon
         tokenizer_ = Tokenizer(self.grammar, self.lexicon, self.input_text_plugins, self.oov_provider_plugins, [])
@@ -92,6 +164,8 @@ class Dictionary:
         self.grammar.set_character_category(char_category)
 
     def close(self):
+        if self.result_cache is not None:
+            self.result_cache.close()
         self.grammar = None
         self.lexicon = None
         for dict_ in self.dictionaries:
@@ -99,4 +173,5 @@ class Dictionary:
 
     def create(self, mode=None):
         return Tokenizer(
-            self.grammar, self.lexicon, self.input_text_plugins, self.oov_provider_plugins, self.path_rewrite_plugins, mode=mode)
+            self.grammar, self.lexicon, self.input_text_plugins, self.oov_provider_plugins, self.path_rewrite_plugins,
+            mode=mode, result_cache=self.result_cache)
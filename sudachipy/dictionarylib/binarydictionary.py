@@ -18,6 +18,7 @@ from .dictionaryversion import has_grammar, has_synonym_group_ids, is_dictionary
 from .dictionaryheader import DictionaryHeader
 from .doublearraylexicon import DoubleArrayLexicon
 from .grammar import Grammar
+from .wordidindex import WORD_ID_INDEX_SUFFIX
 
 
 class BinaryDictionary(object):
@@ -29,7 +30,7 @@ class BinaryDictionary(object):
         self._lexicon = lexicon
 
     @staticmethod
-    def _read_dictionary(filename, access=mmap.ACCESS_READ):
+    def _read_dictionary(filename, access=mmap.ACCESS_READ, word_id_index_file=False):
         with open(filename, 'rb') as system_dic:
             bytes_ = mmap.mmap(system_dic.fileno(), 0, access=access)
         offset = 0
@@ -43,18 +44,20 @@ class BinaryDictionary(object):
             offset += grammar.get_storage_size()
 
         lexicon = DoubleArrayLexicon(bytes_, offset, has_synonym_group_ids(header.version))
+        if word_id_index_file:
+            lexicon.word_id_index_file = filename + WORD_ID_INDEX_SUFFIX
         return bytes_, grammar, header, lexicon
 
     @classmethod
-    def from_system_dictionary(cls, filename):
-        args = cls._read_dictionary(filename)
+    def from_system_dictionary(cls, filename, word_id_index_file=False):
+        args = cls._read_dictionary(filename, word_id_index_file=word_id_index_file)
         if not args[2].is_system_dictionary():
             raise IOError('invalid system dictionary')
         return cls(*args)
 
     @classmethod
-    def from_user_dictionary(cls, filename):
-        args = cls._read_dictionary(filename, mmap.ACCESS_COPY)
+    def from_user_dictionary(cls, filename, word_id_index_file=False):
+        args = cls._read_dictionary(filename, mmap.ACCESS_COPY, word_id_index_file)
         if not args[2].is_user_dictionary():
             raise IOError('invalid user dictionary')
         return cls(*args)
@@ -48,3 +48,21 @@ class CategoryType(Enum):
             return CategoryType[str_]
         except KeyError:
             return None
+
+    @staticmethod
+    def to_mask(types) -> int:
+        mask = 0
+        for type_ in types:
+            mask |= type_.value
+        return mask
+
+    @staticmethod
+    def from_mask(mask: int) -> frozenset:
+        types = _types_of_mask.get(mask)
+        if types is None:
+            types = frozenset(type_ for type_ in CategoryType if type_.value & mask)
+            _types_of_mask[mask] = types
+        return types
+
+
+_types_of_mask = {}
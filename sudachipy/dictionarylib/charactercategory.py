@@ -14,10 +14,13 @@
 
 import math
 import re
+from array import array
 from queue import PriorityQueue
 
 from . import categorytype
 
+_BMP_SIZE = 0x10000
+
 
 class CharacterCategory(object):
 
@@ -52,6 +55,7 @@ class CharacterCategory(object):
 
     def __init__(self):
         self.range_list = []
+        self._bmp_table = None
 
     def _compile(self) -> None:
         """
@@ -101,6 +105,22 @@ class CharacterCategory(object):
                 self.range_list.append(_range)
                 _range = irange
         self.range_list.append(_range)
+        self._bmp_table = None
+
+    def _build_bmp_table(self) -> None:
+        """
+        _build_bmp_table fills a dense table of category masks over the BMP.
+        Code points beyond the BMP are rare and left to the binary search.
+        :return:
+        """
+        table = array('H', [categorytype.CategoryType.DEFAULT.value]) * _BMP_SIZE
+        for range_ in self.range_list:
+            if range_.low >= _BMP_SIZE:
+                break
+            high = min(range_.high, _BMP_SIZE)
+            mask = categorytype.CategoryType.to_mask(range_.categories)
+            table[range_.low:high] = array('H', [mask]) * (high - range_.low)
+        self._bmp_table = table
 
     def get_category_types(self, code_point):
         begin = 0
@@ -121,6 +141,30 @@ class CharacterCategory(object):
             pivot = new_pivot
         return {categorytype.CategoryType.DEFAULT}
 
+    def get_category_mask(self, code_point):
+        """
+        :param code_point: code point
+        :return: the bitwise OR of the values of the category types
+        """
+        if self._bmp_table is None:
+            self._build_bmp_table()
+        if code_point < _BMP_SIZE:
+            return self._bmp_table[code_point]
+        return categorytype.CategoryType.to_mask(self.get_category_types(code_point))
+
+    def get_category_masks(self, text):
+        """
+        :param text: str
+        :return: array of the category masks of each character
+        """
+        if self._bmp_table is None:
+            self._build_bmp_table()
+        if not text:
+            return array('H')
+        if max(text) < chr(_BMP_SIZE):
+            return array('H', map(self._bmp_table.__getitem__, map(ord, text)))
+        return array('H', map(self.get_category_mask, map(ord, text)))
+
     def read_character_definition(self, char_def=None):
         """
         :param char_def: path
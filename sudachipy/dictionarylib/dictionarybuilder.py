@@ -13,7 +13,15 @@
 # limitations under the License.
 
 import csv
+import multiprocessing
 import re
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from collections import deque
+from itertools import islice
 from logging import DEBUG, StreamHandler, getLogger
 
 from dartsclone import DoubleArray
@@ -21,8 +29,72 @@ from dartsclone import DoubleArray
 from sortedcontainers import SortedDict
 
 from sudachipy.dictionarylib.jtypedbytebuffer import JTypedByteBuffer
+from sudachipy.dictionarylib.spilledentries import SpilledEntries
 from sudachipy.dictionarylib.wordinfo import WordInfo
 
+# the number of lines sent to a worker process at once
+_CHUNK_LINES = 4096
+
+
+def _ends_in_quoted_field(line, in_quotes):
+    """ returns whether a quoted field continues to the next line
+
+    The quotes are followed as csv.reader does, where a quote opens a field
+    only at its beginning and is a literal character in an unquoted field.
+
+    Args:
+        line: a line of a CSV file
+        in_quotes: whether the line begins inside a quoted field
+    """
+    if not in_quotes and '"' not in line:
+        return False
+    field_start = not in_quotes
+    after_quote = False
+    for c in line:
+        if in_quotes:
+            if after_quote:
+                after_quote = False
+                if c != '"':  # '""' is an escaped quote
+                    in_quotes = False
+                    field_start = c == ','
+            elif c == '"':
+                after_quote = True
+        elif c == '"' and field_start:
+            in_quotes = True
+        else:
+            field_start = c == ','
+    return in_quotes and not after_quote
+
+
+def _read_line_chunks(lexicon_input_stream, size):
+    """ splits the lines of a CSV file into chunks not cutting a quoted field having a line break """
+    chunk = []
+    in_quotes = False
+    for line in lexicon_input_stream:
+        chunk.append(line)
+        in_quotes = _ends_in_quoted_field(line, in_quotes)
+        if len(chunk) >= size and not in_quotes:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _decode_chunk(builder_class, lines):
+    """ decodes the rows in a worker process
+
+    Returns:
+        the decoded columns of the rows, and the exception raised at the row
+        following them or None
+    """
+    rows = []
+    try:
+        for cols in csv.reader(lines):
+            rows.append(builder_class.decode_columns(cols))
+    except Exception as e:
+        return rows, e
+    return rows, None
+
 
 class DictionaryBuilder(object):
 
@@ -31,6 +103,9 @@ class DictionaryBuilder(object):
     __MIN_REQUIRED_COLS_NUM = 18
     __BUFFER_SIZE = 1024 * 1024
     __PATTERN_UNICODE_LITERAL = re.compile(r"\\u([0-9a-fA-F]{4}|{[0-9a-fA-F]+})")
+    # lines of three integers
+    __PATTERN_MATRIX_ROW = re.compile(r"(?:[ \t]*-?\d+[ \t]+-?\d+[ \t]+-?\d+[ \t]*\r?\n)*"
+                                      r"(?:[ \t]*-?\d+[ \t]+-?\d+[ \t]+-?\d+[ \t]*\r?\n?)?")
     __ARRAY_MAX_LENGTH = __BYTE_MAX_VALUE  # max value of byte in Java
     __STRING_MAX_LENGTH = 32767  # max value of short in Java
     is_user_dictionary = False
@@ -47,12 +122,14 @@ class DictionaryBuilder(object):
 
         def __init__(self):
             self.table = []
+            self.ids = {}
 
         def get_id(self, str_):
-            id_ = self.table.index(str_) if str_ in self.table else -1
+            id_ = self.ids.get(str_, -1)
             if id_ < 0:
                 id_ = len(self.table)
                 self.table.append(str_)
+                self.ids[str_] = id_
             return id_
 
         def get_list(self):
@@ -69,48 +146,125 @@ class DictionaryBuilder(object):
         logger.propagate = False
         return logger
 
-    def __init__(self, *, logger=None):
+    def __init__(self, *, logger=None, processes=1, streaming=False, temp_dir=None):
+        """ Constructs a builder.
+
+        Args:
+            logger: the logger of the progress
+            processes: the number of processes to decode the rows of the source files
+            streaming: keeps the words in temporary files instead of the memory
+            temp_dir: the directory of the temporary files (default: the system temporary directory)
+        """
+        if processes < 1:
+            raise ValueError('processes must be positive')
+        self.processes = processes
+        self.temp_dir = temp_dir
+        self.spill = SpilledEntries(temp_dir) if streaming else None
         self.byte_buffer = JTypedByteBuffer()
         self.trie_keys = SortedDict()
         self.entries = []
+        # the first word ID of each (surface, POS ID, reading form) to resolve the split information
+        self.word_ids = {}
         self.is_dictionary = False
         self.pos_table = self.PosTable()
         self.logger = logger or self.__default_logger()
 
     def build(self, lexicon_paths, matrix_input_stream, out_stream):
-        self.logger.info('reading the source file...')
-        for path in lexicon_paths:
-            with open(path, 'r', encoding='utf-8') as rf:
-                self.build_lexicon(rf)
-        self.logger.info('{} words\n'.format(len(self.entries)))
-
-        self.write_grammar(matrix_input_stream, out_stream)
-        self.write_lexicon(out_stream)
+        try:
+            self.logger.info('reading the source file...')
+            for path in lexicon_paths:
+                with open(path, 'r', encoding='utf-8') as rf:
+                    self.build_lexicon(rf)
+            self.logger.info('{} words\n'.format(self.word_size()))
+
+            self.write_grammar(matrix_input_stream, out_stream)
+            self.write_lexicon(out_stream)
+        finally:
+            self.close()
+
+    def close(self):
+        """ removes the temporary files of the streaming mode """
+        if self.spill:
+            self.spill.close()
+            self.spill = None
+
+    def word_size(self):
+        return self.spill.size if self.spill else len(self.entries)
 
     def build_lexicon(self, lexicon_input_stream):
+        if self.processes > 1:
+            self.build_lexicon_in_parallel(lexicon_input_stream)
+            return
         line_no = -1
         try:
             for i, row in enumerate(csv.reader(lexicon_input_stream)):
                 line_no = i
-                entry = self.parse_line(row)
-                if entry.headword:
-                    self.add_to_trie(entry.headword, len(self.entries))
-                self.entries.append(entry)
+                self.add_entry(self.parse_line(row))
+        except Exception as e:
+            if line_no >= 0:
+                self.logger.error(
+                    '{} at line {} in {}\n'.format(e.args[0], line_no, lexicon_input_stream.name))
+            raise e
+
+    def build_lexicon_in_parallel(self, lexicon_input_stream):
+        """ reads the source file decoding the rows in the worker processes
+
+        The rows are decoded and checked in parallel, and the word entries are
+        made from them in the order of the rows, so the word IDs and the POS
+        IDs are the same as build_lexicon in a single process.
+        """
+        line_no = -1
+        try:
+            for rows, error in self.__decode_in_parallel(lexicon_input_stream):
+                for cols in rows:
+                    line_no += 1
+                    self.add_entry(self.parse_columns(cols))
+                if error is not None:
+                    line_no += 1
+                    raise error
         except Exception as e:
             if line_no >= 0:
                 self.logger.error(
                     '{} at line {} in {}\n'.format(e.args[0], line_no, lexicon_input_stream.name))
             raise e
 
+    def __decode_in_parallel(self, lexicon_input_stream):
+        pending = deque()
+        with multiprocessing.Pool(self.processes) as pool:
+            for lines in _read_line_chunks(lexicon_input_stream, _CHUNK_LINES):
+                pending.append(pool.apply_async(_decode_chunk, (type(self), lines)))
+                # keeps the memory bounded not reading ahead the whole file
+                if len(pending) >= 2 * self.processes:
+                    yield pending.popleft().get()
+            while pending:
+                yield pending.popleft().get()
+
+    def add_entry(self, entry):
+        if self.spill:
+            self.spill.add(entry)
+            return
+        if entry.headword:
+            self.add_to_trie(entry.headword, len(self.entries))
+        info = entry.wordinfo
+        self.word_ids.setdefault((info.surface, info.pos_id, info.reading_form), len(self.entries))
+        self.entries.append(entry)
+
     def parse_line(self, cols):
-        if len(cols) < self.__MIN_REQUIRED_COLS_NUM:
+        return self.parse_columns(self.decode_columns(cols))
+
+    @classmethod
+    def decode_columns(cls, cols):
+        """ decodes and checks the columns of a row, which does not depend on the other rows """
+        if len(cols) < cls.__MIN_REQUIRED_COLS_NUM:
             raise ValueError('invalid format')
-        cols = [self.decode(col) for col in cols]
-        if not self.__is_length_valid(cols):
+        cols = [cls.decode(col) for col in cols]
+        if not cls.__is_length_valid(cols):
             raise ValueError('string is too long')
         if not cols[0]:
             raise ValueError('headword is empty')
+        return cols
 
+    def parse_columns(self, cols):
         entry = self.WordEntry()
         # head word for trie
         if cols[1] != '-1':
@@ -143,12 +297,13 @@ class DictionaryBuilder(object):
             cols[4], head_length, pos_id, cols[12], dict_from_wordid, '', cols[11], None, None, None, synonym_group_ids)
         return entry
 
-    def __is_length_valid(self, cols):
+    @classmethod
+    def __is_length_valid(cls, cols):
         head_length = len(cols[0].encode('utf-8'))
-        return head_length <= self.__STRING_MAX_LENGTH \
-            and len(cols[4]) <= self.__STRING_MAX_LENGTH \
-            and len(cols[11]) <= self.__STRING_MAX_LENGTH \
-            and len(cols[12]) <= self.__STRING_MAX_LENGTH
+        return head_length <= cls.__STRING_MAX_LENGTH \
+            and len(cols[4]) <= cls.__STRING_MAX_LENGTH \
+            and len(cols[11]) <= cls.__STRING_MAX_LENGTH \
+            and len(cols[12]) <= cls.__STRING_MAX_LENGTH
 
     def add_to_trie(self, headword, word_id):
         key = headword.encode('utf-8')
@@ -198,34 +353,80 @@ class DictionaryBuilder(object):
         self.byte_buffer.write_int(lsize, 'short')
         self.byte_buffer.write_int(rsize, 'short')
 
-        matrix = JTypedByteBuffer()
-
-        for i, line in enumerate(matrix_input.readlines()):
-            line = line.strip()
-            if re.fullmatch(r"\s*", line) or re.match("#", line):
+        matrix = array('h', bytes(2 * lsize * rsize))
+        # reads the lines for a left-ID at once, because matrix.def lists the
+        # costs of each left-ID in the order of the right-IDs in most cases
+        lines_per_chunk = rsize if rsize > 0 else 1
+        right_ids = [str(r) for r in range(rsize)]
+        line_no = 0
+        rest = []
+        while True:
+            lines = rest + list(islice(matrix_input, lines_per_chunk - len(rest)))
+            rest = []
+            if not lines:
+                break
+            if self.__convert_matrix_row(lines, matrix, lsize, right_ids):
+                line_no += len(lines)
                 continue
-            cols = line.split()
-            if len(cols) < 3:
-                self.logger.warn('invalid format at line {}'.format(i))
-                continue
-            l, r, cost = [int(col) for col in cols]
-            pos = matrix.tell()
-            matrix.seek(2 * (l + lsize * r))
-            matrix.write_int(cost, 'short')
-            matrix.seek(pos)
-        return matrix
+            # converts the lines before the next right-ID 0 one by one, and
+            # reads a block from there, so a comment or a blank line does not
+            # shift all the following blocks
+            end = next((i for i in range(1, len(lines)) if self.__starts_matrix_row(lines[i])), len(lines))
+            for i, line in enumerate(lines[:end], line_no):
+                self.__convert_matrix_line(line, i, matrix, lsize, rsize)
+            rest = lines[end:]
+            line_no += end
+        if sys.byteorder != 'little':
+            matrix.byteswap()
+        return JTypedByteBuffer(matrix.tobytes())
+
+    @classmethod
+    def __convert_matrix_row(cls, lines, matrix, lsize, right_ids):
+        """ sets the costs of a left-ID at once if the lines are the costs of all right-IDs in order """
+        text = ''.join(lines)
+        if not cls.__PATTERN_MATRIX_ROW.fullmatch(text):
+            return False
+        values = text.split()
+        # compares the IDs as strings, which is faster than converting them
+        if values[1::3] != right_ids or values[0::3] != [values[0]] * len(right_ids):
+            return False
+        left_id = int(values[0])
+        if not 0 <= left_id < lsize:
+            return False
+        matrix[left_id::lsize] = array('h', map(int, values[2::3]))
+        return True
+
+    @staticmethod
+    def __starts_matrix_row(line):
+        cols = line.split(maxsplit=2)
+        return len(cols) == 3 and cols[1] == '0' and not cols[0].startswith('#')
+
+    def __convert_matrix_line(self, line, line_no, matrix, lsize, rsize):
+        line = line.strip()
+        if re.fullmatch(r"\s*", line) or re.match("#", line):
+            return
+        cols = line.split()
+        if len(cols) < 3:
+            self.logger.warn('invalid format at line {}'.format(line_no))
+            return
+        l, r, cost = [int(col) for col in cols]
+        if not (0 <= l < lsize and 0 <= r < rsize):
+            raise ValueError('invalid format at line {}'.format(line_no))
+        matrix[l + lsize * r] = cost
 
     def write_lexicon(self, io_out):
         trie = DoubleArray()
-        wordid_table = JTypedByteBuffer()
+        # the word-ID table is as large as the words in the streaming mode
+        wordid_table = tempfile.TemporaryFile(dir=self.temp_dir) if self.spill else JTypedByteBuffer()
         keys = []
         vals = []
-        for key, word_ids in self.trie_keys.items():
+        size = 0
+        for key, word_ids in (self.spill.trie_keys() if self.spill else self.trie_keys.items()):
             keys.append(key)
-            vals.append(wordid_table.tell())
-            wordid_table.write_int(len(word_ids), 'byte')
-            for wid in word_ids:
-                wordid_table.write_int(wid, 'int')
+            vals.append(size)
+            wordid_table.write(len(word_ids).to_bytes(1, 'little'))
+            wordid_table.write(struct.pack('<{}i'.format(len(word_ids)), *word_ids))
+            size += 1 + 4 * len(word_ids)
 
         self.logger.info('building the trie...')
 
@@ -245,18 +446,24 @@ class DictionaryBuilder(object):
         del trie
 
         self.logger.info('writing the word-ID table...')
-        self.byte_buffer.write_int(wordid_table.tell(), 'int')
+        self.byte_buffer.write_int(size, 'int')
         self.byte_buffer.seek(0)
         io_out.write(self.byte_buffer.read())
         self.byte_buffer.clear()
 
         wordid_table.seek(0)
-        io_out.write(wordid_table.read())
-        self.__logging_size(wordid_table.tell() + 4)
+        shutil.copyfileobj(wordid_table, io_out, self.__BUFFER_SIZE)
+        self.__logging_size(size + 4)
+        wordid_table.close()
         del wordid_table
 
         self.logger.info('writing the word parameters...')
-        self.byte_buffer.write_int(len(self.entries), 'int')
+        self.byte_buffer.write_int(self.word_size(), 'int')
+        if self.spill:
+            self.byte_buffer.seek(0)
+            io_out.write(self.byte_buffer.read())
+            self.byte_buffer.clear()
+            self.spill.copy_parameters(io_out)
         for entry in self.entries:
             self.byte_buffer.write_int(entry.parameters[0], 'short')
             self.byte_buffer.write_int(entry.parameters[1], 'short')
@@ -264,18 +471,21 @@ class DictionaryBuilder(object):
             self.byte_buffer.seek(0)
             io_out.write(self.byte_buffer.read())
             self.byte_buffer.clear()
-        self.__logging_size(len(self.entries) * 6 + 4)
+        self.__logging_size(self.word_size() * 6 + 4)
         self.write_wordinfo(io_out)
 
     def write_wordinfo(self, io_out):
         mark = io_out.tell()
-        io_out.seek(mark * 4 + len(self.entries))
+        io_out.seek(mark * 4 + self.word_size())
         offsets = JTypedByteBuffer()
         self.logger.info('writing the word_infos...')
         base = io_out.tell()
-        for entry in self.entries:
+        # the records are written at once every __BUFFER_SIZE bytes, and
+        # the offsets are written after them
+        written = 0
+        for entry in (self.spill.entries(self.WordEntry) if self.spill else self.entries):
             wi = entry.wordinfo
-            offsets.write_int(io_out.tell(), 'int')
+            offsets.write_int(base + written + self.byte_buffer.tell(), 'int')
             self.write_string(wi.surface)
             self.write_stringlength(wi.length())
             self.byte_buffer.write_int(wi.pos_id, 'short')
@@ -293,24 +503,25 @@ class DictionaryBuilder(object):
             self.write_intarray(self.parse_splitinfo(entry.bunit_split_string))
             self.write_intarray(self.parse_splitinfo(entry.cunit_split_string))
             self.write_intarray(wi.synonym_group_ids)
-            self.byte_buffer.seek(0)
-            io_out.write(self.byte_buffer.read())
-            self.byte_buffer.clear()
-        self.__logging_size(io_out.tell() - base)
+            if self.byte_buffer.tell() >= self.__BUFFER_SIZE:
+                written += self.__flush_byte_buffer(io_out)
+        written += self.__flush_byte_buffer(io_out)
+        self.__logging_size(written)
         self.logger.info('writing word_info offsets...')
         io_out.seek(mark)
         offsets.seek(0)
         io_out.write(offsets.read())
         self.__logging_size(offsets.tell())
 
-    def decode(self, str_):
+    @classmethod
+    def decode(cls, str_):
         def replace(match):
             uni_text = match.group()
             uni_text = uni_text.replace('{', '').replace('}', '')
             if len(uni_text) > 6:
                 uni_text = ('\\U000{}'.format(uni_text[2:]))
             return uni_text.encode('ascii').decode('unicode-escape')
-        return re.sub(self.__PATTERN_UNICODE_LITERAL, replace, str_)
+        return re.sub(cls.__PATTERN_UNICODE_LITERAL, replace, str_)
 
     def check_splitinfo_format(self, str_):
         if str_.count('/') + 1 > self.__ARRAY_MAX_LENGTH:
@@ -358,16 +569,12 @@ class DictionaryBuilder(object):
         return self.get_wordid(headword, pos_id, reading)
 
     def get_wordid(self, headword, pos_id, reading_form):
-        for i in range(len(self.entries)):
-            info = self.entries[i].wordinfo
-            if info.surface == headword \
-                    and info.pos_id == pos_id \
-                    and info.reading_form == reading_form:
-                return i
-        return -1
+        if self.spill:
+            return self.spill.get_word_id(headword, pos_id, reading_form)
+        return self.word_ids.get((headword, pos_id, reading_form), -1)
 
     def check_wordid(self, wid):
-        if wid < 0 or wid >= len(self.entries):
+        if wid < 0 or wid >= self.word_size():
             raise ValueError('invalid word ID')
 
     def parse_synonym_group_ids(self, text):
@@ -400,5 +607,12 @@ class DictionaryBuilder(object):
         for item in array:
             self.byte_buffer.write_int(item, 'int')
 
+    def __flush_byte_buffer(self, io_out):
+        size = self.byte_buffer.tell()
+        self.byte_buffer.seek(0)
+        io_out.write(self.byte_buffer.read())
+        self.byte_buffer.clear()
+        return size
+
     def __logging_size(self, size):
         self.logger.info('{} bytes\n'.format(size))
@@ -20,6 +20,7 @@ from . import wordidtable
 from . import wordinfolist
 from . import wordparameterlist
 from .lexicon import Lexicon
+from .wordidindex import WordIdIndex, compute_stamp
 
 
 class DoubleArrayLexicon(Lexicon):
@@ -27,10 +28,16 @@ class DoubleArrayLexicon(Lexicon):
     __SIGNED_SHORT_MIN = -32768
     __SIGNED_SHORT_MAX = 32767
     __USER_DICT_COST_PER_MORPH = -20
+    # bytes of the input passed to the trie at once. Longer keys are still
+    # found, by searching the rest of the input again.
+    __LOOKUP_WINDOW = 256
 
     trie = None
     word_id_table = None
     word_params = None
+    # the file to keep the index of get_word_id in. None keeps it only in memory.
+    word_id_index_file = None
+    word_id_index = None
 
     def __init__(self, bytes_: mmap.mmap, offset: int, has_synonym_gid: bool):
         self.trie = DoubleArray()
@@ -54,7 +61,12 @@ class DoubleArrayLexicon(Lexicon):
         del self.word_params
 
     def lookup(self, text: bytes, offset: int) -> Lexicon.Itr:
-        key = text[offset:]
+        # copying text[offset:] at every offset makes building a lattice
+        # quadratic in the input length, so only a window is copied
+        key = text[offset:offset + self.__LOOKUP_WINDOW]
+        if len(key) == self.__LOOKUP_WINDOW and self.trie.traverse(key, 0, 0, len(key)) != -2:
+            # some key is longer than the window
+            key = text[offset:]
         result = self.trie.common_prefix_search(key, length=len(key))
         for index, length in result:
             word_ids = self.word_id_table.get(index)
@@ -82,12 +94,32 @@ class DoubleArrayLexicon(Lexicon):
             if self._compare_word_id(wid, headword, pos_id, reading_form):
                 return wid
 
-        for wid in range(self.word_infos.size()):
+        # the headword may differ from the key in the trie
+        for wid in self._get_word_id_index().find(headword, pos_id, reading_form):
             if self._compare_word_id(wid, headword, pos_id, reading_form):
                 return wid
 
         return -1
 
+    def _get_word_id_index(self) -> WordIdIndex:
+        if self.word_id_index is not None:
+            return self.word_id_index
+        index = None
+        stamp = 0
+        if self.word_id_index_file:
+            stamp = compute_stamp(self.word_infos)
+            index = WordIdIndex.load(self.word_id_index_file, self.word_infos.size(), stamp)
+        if index is None:
+            index = WordIdIndex.build(self.word_infos)
+            if self.word_id_index_file:
+                try:
+                    index.save(self.word_id_index_file, stamp)
+                except OSError:
+                    # the directory of the dictionary may be read-only
+                    pass
+        self.word_id_index = index
+        return index
+
     def _compare_word_id(self, wid: int, headword: str, pos_id: int, reading_form: str) -> bool:
         info = self.word_infos.get_word_info(wid)
         return info.surface == headword \
@@ -28,11 +28,14 @@ class Grammar:
         bytes_.seek(offset)
         pos_size = self.bytes_get_short(bytes_)
         self.pos_list = []
+        # POS ID of each part-of-speech as a tuple
+        self._pos_ids = {}
         for i in range(pos_size):
             pos = []
             for j in range(self._POS_DEPTH):
                 pos.append(self.bytes_get_string(bytes_))
             self.pos_list.append(pos)
+            self._pos_ids.setdefault(tuple(pos), i)
         left_id_size = self.bytes_get_short(bytes_)
         right_id_size = self.bytes_get_short(bytes_)
         connect_table_offset = bytes_.tell()
@@ -55,7 +58,7 @@ class Grammar:
         return self.pos_list[pos_id]
 
     def get_part_of_speech_id(self, pos):
-        return self.pos_list.index(pos) if pos in self.pos_list else -1
+        return self._pos_ids.get(tuple(pos), -1)
 
     def get_connect_cost(self, left: int, right: int) -> int:
         """ Returns connection cost of nodes
@@ -106,4 +109,6 @@ class Grammar:
         return int.from_bytes(bytes_.read(2), 'little', signed=True)
 
     def add_pos_list(self, grammar):
-        self.pos_list.extend(grammar.pos_list)
+        for pos in list(grammar.pos_list):
+            self._pos_ids.setdefault(tuple(pos), len(self.pos_list))
+            self.pos_list.append(pos)
@@ -12,24 +12,29 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from functools import lru_cache
-from typing import List
+from typing import Iterable, List, Tuple
 
 from .lexicon import Lexicon
+from .wordinfocache import WordInfoCache
+from ..config import DEFAULT_WORD_INFO_CACHE_SIZE
 
 
 class LexiconSet(Lexicon):
 
     __MAX_DICTIONARIES = 16
 
-    def __init__(self, system_lexicon: Lexicon):
+    def __init__(self, system_lexicon: Lexicon, word_info_cache_size: int = DEFAULT_WORD_INFO_CACHE_SIZE):
         self.lexicons = [system_lexicon]
         self.pos_offsets = [0]
+        self.word_info_cache = WordInfoCache(word_info_cache_size)
+        self.split_cache = WordInfoCache(word_info_cache_size)
 
     def add(self, lexicon: Lexicon, pos_offset: int) -> None:
         if lexicon not in self.lexicons:
             self.lexicons.append(lexicon)
             self.pos_offsets.append(pos_offset)
+            self.word_info_cache.clear()
+            self.split_cache.clear()
 
     def is_full(self) -> bool:
         return len(self.lexicons) >= self.__MAX_DICTIONARIES
@@ -58,12 +63,53 @@ class LexiconSet(Lexicon):
         return self.lexicons[self.get_dictionary_id(word_id)]\
             .get_cost(self.get_word_id1(word_id))
 
-    @lru_cache(1024)
     def get_word_info(self, word_id: int) -> 'WordInfo':  # noqa: F821
+        winfo = self.word_info_cache.get(word_id)
+        if winfo is None:
+            winfo = self._read_word_info(word_id)
+            self.word_info_cache.put(word_id, winfo)
+        return winfo
+
+    def pin_word_info(self, word_ids: Iterable[int]) -> None:
+        """ keeps the word information of word_ids in the cache for good """
+        for word_id in word_ids:
+            self.word_info_cache.pin(word_id, self._read_word_info(word_id))
+
+    def get_split(self, word_id: int, a_unit: bool) -> Tuple[Tuple[int, int], ...]:
+        """ returns the sub-words of a word in A or B unit
+
+        The results are cached, so the word information of the sub-words
+        is not read again for the next occurrence of the word.
+
+        Args:
+            word_id: the word ID
+            a_unit: returns the A unit if True, otherwise the B unit
+        Returns:
+            tuple of (word ID, length in bytes) of the sub-words.
+            It is empty if the word is not split.
+
+        """
+        key = (word_id << 1) | a_unit
+        split = self.split_cache.get(key)
+        if split is None:
+            split = self.split_word_info(self.get_word_info(word_id), a_unit)
+            self.split_cache.put(key, split)
+        return split
+
+    def split_word_info(self, word_info: 'WordInfo', a_unit: bool) -> Tuple[Tuple[int, int], ...]:  # noqa: F821
+        """ returns the sub-words of a word information like get_split without the cache """
+        word_ids = word_info.a_unit_split if a_unit else word_info.b_unit_split
+        if len(word_ids) <= 1:
+            return ()
+        return tuple((wid, self.get_word_info(wid).head_word_length) for wid in word_ids)
+
+    def _read_word_info(self, word_id: int) -> 'WordInfo':  # noqa: F821
         dic_id = self.get_dictionary_id(word_id)
         winfo = self.lexicons[dic_id].get_word_info(self.get_word_id1(word_id))
+        if dic_id == 0:  # the fields are decoded lazily and need no conversion
+            return winfo
         pos_id = winfo.pos_id
-        if dic_id > 0 and pos_id >= self.pos_offsets[1]:  # user defined part-of-speech
+        if pos_id >= self.pos_offsets[1]:  # user defined part-of-speech
             winfo.pos_id = winfo.pos_id - self.pos_offsets[1] + self.pos_offsets[dic_id]
         winfo.a_unit_split = self.convert_split(winfo.a_unit_split, dic_id)
         winfo.b_unit_split = self.convert_split(winfo.b_unit_split, dic_id)
@@ -0,0 +1,180 @@
+# Copyright (c) 2019 Works Applications Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import heapq
+import os
+import pickle
+import shutil
+import sqlite3
+import struct
+import tempfile
+from itertools import groupby
+from typing import BinaryIO, Iterator, List, Tuple
+
+from .wordinfo import WordInfo
+
+# the number of trie keys sorted in memory at once
+DEFAULT_RUN_SIZE = 1 << 20
+
+_BUFFER_SIZE = 1 << 20
+# the number of words inserted into the index at once
+_INSERT_BATCH_SIZE = 10000
+_KEY_LENGTH = struct.Struct('<H')
+_WORD_ID = struct.Struct('<i')
+_PARAMETERS = struct.Struct('<hhh')
+_RECORD_LENGTH = struct.Struct('<I')
+
+
+def _write_run(path: str, pairs: List[Tuple[bytes, int]]) -> None:
+    pairs.sort()
+    with open(path, 'wb', buffering=_BUFFER_SIZE) as f:
+        for key, word_id in pairs:
+            f.write(_KEY_LENGTH.pack(len(key)))
+            f.write(key)
+            f.write(_WORD_ID.pack(word_id))
+
+
+def _read_run(path: str) -> Iterator[Tuple[bytes, int]]:
+    with open(path, 'rb', buffering=_BUFFER_SIZE) as f:
+        while True:
+            data = f.read(_KEY_LENGTH.size)
+            if not data:
+                return
+            key = f.read(_KEY_LENGTH.unpack(data)[0])
+            yield key, _WORD_ID.unpack(f.read(_WORD_ID.size))[0]
+
+
+class SpilledEntries(object):
+    """ word entries of DictionaryBuilder kept in temporary files
+
+    The parameters and the word information are appended to files in the
+    order of the word IDs. The pairs of a trie key and a word ID are
+    sorted in runs of run_size pairs, which are written to files and merged
+    when the trie is built. The word IDs for the split information are
+    looked up in a sqlite table. So the memory used does not grow with the
+    number of the words, except for the keys given to the trie.
+
+    Attributes:
+        size: the number of the words
+        run_size: the number of trie keys sorted in memory at once
+
+    """
+
+    def __init__(self, directory: str = None, run_size: int = DEFAULT_RUN_SIZE):
+        """ Constructs an empty spill.
+
+        Args:
+            directory: the directory to make the temporary files in (default: the system temporary directory)
+            run_size: the number of trie keys sorted in memory at once
+        """
+        if run_size < 1:
+            raise ValueError('run_size must be positive')
+        self.size = 0
+        self.run_size = run_size
+        self._directory = tempfile.TemporaryDirectory(prefix='sudachipy-build-', dir=directory)
+        self._params = open(self._path('params'), 'wb', buffering=_BUFFER_SIZE)
+        self._infos = open(self._path('infos'), 'wb', buffering=_BUFFER_SIZE)
+        self._pairs = []
+        self._runs = []
+        self._words = []
+        self._index = sqlite3.connect(self._path('words.db'))
+        self._index.execute('PRAGMA journal_mode = OFF')
+        self._index.execute('PRAGMA synchronous = OFF')
+        self._index.execute('CREATE TABLE words (surface TEXT, pos_id INTEGER, reading_form TEXT, word_id INTEGER, '
+                            'PRIMARY KEY (surface, pos_id, reading_form)) WITHOUT ROWID')
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self._directory.name, name)
+
+    def add(self, entry) -> None:
+        """ appends a WordEntry of DictionaryBuilder """
+        word_id = self.size
+        if entry.headword:
+            self._pairs.append((entry.headword.encode('utf-8'), word_id))
+            if len(self._pairs) >= self.run_size:
+                self._flush_pairs()
+        self._params.write(_PARAMETERS.pack(*entry.parameters))
+        wi = entry.wordinfo
+        # each record is pickled by itself, because an Unpickler reading
+        # the whole file would keep all the records in its memo
+        record = pickle.dumps((wi.surface, wi.head_word_length, wi.pos_id, wi.normalized_form,
+                               wi.dictionary_form_word_id, wi.reading_form, wi.synonym_group_ids,
+                               entry.aunit_split_string, entry.bunit_split_string, entry.cunit_split_string),
+                              pickle.HIGHEST_PROTOCOL)
+        self._infos.write(_RECORD_LENGTH.pack(len(record)))
+        self._infos.write(record)
+        self._words.append((wi.surface, wi.pos_id, wi.reading_form, word_id))
+        if len(self._words) >= _INSERT_BATCH_SIZE:
+            self._flush_words()
+        self.size += 1
+
+    def _flush_pairs(self) -> None:
+        if self._pairs:
+            path = self._path('run{}'.format(len(self._runs)))
+            _write_run(path, self._pairs)
+            self._runs.append(path)
+            self._pairs = []
+
+    def _flush_words(self) -> None:
+        # the first word of the same key is kept as DictionaryBuilder.get_wordid does
+        self._index.executemany('INSERT OR IGNORE INTO words VALUES (?, ?, ?, ?)', self._words)
+        self._words = []
+
+    def get_word_id(self, surface: str, pos_id: int, reading_form: str) -> int:
+        if self._words:
+            self._flush_words()
+        row = self._index.execute('SELECT word_id FROM words WHERE surface = ? AND pos_id = ? AND reading_form = ?',
+                                  (surface, pos_id, reading_form)).fetchone()
+        return row[0] if row else -1
+
+    def trie_keys(self) -> Iterator[Tuple[bytes, List[int]]]:
+        """ yields the trie keys and their word IDs in the order of the keys """
+        self._flush_pairs()
+        merged = heapq.merge(*[_read_run(path) for path in self._runs])
+        for key, pairs in groupby(merged, key=lambda pair: pair[0]):
+            yield key, [word_id for _, word_id in pairs]
+
+    def copy_parameters(self, io_out: BinaryIO) -> None:
+        """ writes the parameters of all words """
+        self._params.flush()
+        with open(self._path('params'), 'rb') as f:
+            shutil.copyfileobj(f, io_out, _BUFFER_SIZE)
+
+    def entries(self, entry_class) -> Iterator:
+        """ yields the word entries in the order of the word IDs
+
+        Args:
+            entry_class: WordEntry of DictionaryBuilder
+        """
+        self._infos.flush()
+        with open(self._path('infos'), 'rb', buffering=_BUFFER_SIZE) as f:
+            for _ in range(self.size):
+                length, = _RECORD_LENGTH.unpack(f.read(_RECORD_LENGTH.size))
+                (surface, head_length, pos_id, normalized_form, dictionary_form_word_id, reading_form,
+                 synonym_group_ids, aunit_split_string, bunit_split_string, cunit_split_string) = \
+                    pickle.loads(f.read(length))
+                entry = entry_class()
+                entry.wordinfo = WordInfo(surface, head_length, pos_id, normalized_form, dictionary_form_word_id,
+                                          '', reading_form, None, None, None, synonym_group_ids)
+                entry.aunit_split_string = aunit_split_string
+                entry.bunit_split_string = bunit_split_string
+                entry.cunit_split_string = cunit_split_string
+                yield entry
+
+    def close(self) -> None:
+        """ removes the temporary files """
+        self._params.close()
+        self._infos.close()
+        self._index.close()
+        self._directory.cleanup()
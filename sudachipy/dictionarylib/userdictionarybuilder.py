@@ -17,8 +17,8 @@ from .dictionarybuilder import DictionaryBuilder
 
 class UserDictionaryBuilder(DictionaryBuilder):
 
-    def __init__(self, grammar, system_lexicon, *, logger=None):
-        super().__init__(logger=logger)
+    def __init__(self, grammar, system_lexicon, *, logger=None, processes=1, streaming=False, temp_dir=None):
+        super().__init__(logger=logger, processes=processes, streaming=streaming, temp_dir=temp_dir)
         self.is_user_dictionary = True
         self.grammar = grammar
         self.system_lexicon = system_lexicon
@@ -30,14 +30,17 @@ class UserDictionaryBuilder(DictionaryBuilder):
         :param out_stream:
         :return:
         """
-        self.logger.info('reading the source file...')
-        for path in lexicon_paths:
-            with open(path, 'r', encoding='utf-8') as rf:
-                self.build_lexicon(rf)
-        self.logger.info('{} words\n'.format(len(self.entries)))
-
-        self.write_grammar(None, out_stream)
-        self.write_lexicon(out_stream)
+        try:
+            self.logger.info('reading the source file...')
+            for path in lexicon_paths:
+                with open(path, 'r', encoding='utf-8') as rf:
+                    self.build_lexicon(rf)
+            self.logger.info('{} words\n'.format(self.word_size()))
+
+            self.write_grammar(None, out_stream)
+            self.write_lexicon(out_stream)
+        finally:
+            self.close()
 
     def get_posid(self, strs):
         pos_id = self.grammar.get_part_of_speech_id(strs)
@@ -0,0 +1,147 @@
+# Copyright (c) 2019 Works Applications Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+from typing import Iterator, Optional
+
+from .wordinfolist import WordInfoList
+
+WORD_ID_INDEX_SUFFIX = '.widx'
+
+_MAGIC = b'SWIX'
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct('<4sIII')
+# bytes of the dictionary hashed at once to compute the stamp
+_STAMP_CHUNK_SIZE = 1 << 20
+
+
+def _key_hash(headword: str, pos_id: int, reading_form: str) -> int:
+    return zlib.crc32('{}\t{}\t{}'.format(headword, pos_id, reading_form).encode('utf-8'))
+
+
+def compute_stamp(word_infos: WordInfoList) -> int:
+    """ returns a checksum of the word information of a dictionary
+
+    The word parameters are not included, because the costs of a user
+    dictionary are changed after loading it.
+    """
+    bytes_ = word_infos.bytes
+    stamp = 0
+    for begin in range(word_infos.offset, len(bytes_), _STAMP_CHUNK_SIZE):
+        stamp = zlib.crc32(bytes_[begin:begin + _STAMP_CHUNK_SIZE], stamp)
+    return stamp
+
+
+class WordIdIndex(object):
+    """ index from (headword, part-of-speech ID, reading form) to word IDs
+
+    The index holds the hashes of the keys in ascending order and the word
+    IDs in the same order, so a lookup is a binary search. Different keys
+    may have the same hash, so the word IDs found must be checked by the
+    caller.
+
+    Attributes:
+        hashes: the hashes of the keys in ascending order
+        word_ids: the word ID of each hash
+
+    """
+
+    def __init__(self, hashes: array, word_ids: array):
+        self.hashes = hashes
+        self.word_ids = word_ids
+
+    @classmethod
+    def build(cls, word_infos: WordInfoList) -> 'WordIdIndex':
+        """ builds an index of all words
+
+        Only the surface, the part-of-speech ID and the reading form are
+        decoded, not the whole WordInfo.
+        """
+        bytes_ = word_infos.bytes
+        entries = []
+        for word_id in range(word_infos.size()):
+            offset = word_infos.word_id_to_offset(word_id)
+            surface, offset = word_infos.buffer_to_string(offset)
+            _, offset = word_infos.buffer_to_string_length(offset)
+            pos_id = int.from_bytes(bytes_[offset:offset + 2], 'little')
+            length, offset = word_infos.buffer_to_string_length(offset + 2)
+            # skips the normalized form and the dictionary form word ID
+            reading_form, _ = word_infos.buffer_to_string(offset + 2 * length + 4)
+            entries.append((_key_hash(surface, pos_id, reading_form or surface), word_id))
+        entries.sort()
+        return cls(array('I', (h for h, _ in entries)), array('i', (wid for _, wid in entries)))
+
+    def find(self, headword: str, pos_id: int, reading_form: str) -> Iterator[int]:
+        """ yields the IDs of the words which may have the key, in ascending order """
+        key = _key_hash(headword, pos_id, reading_form)
+        hashes = self.hashes
+        i = bisect_left(hashes, key)
+        while i < len(hashes) and hashes[i] == key:
+            yield self.word_ids[i]
+            i += 1
+
+    def save(self, path: str, stamp: int) -> None:
+        """ writes the index to a file
+
+        Args:
+            path: the file to write
+            stamp: the stamp of the dictionary computed by compute_stamp
+        """
+        hashes, word_ids = self.hashes, self.word_ids
+        if sys.byteorder != 'little':
+            hashes, word_ids = array('I', hashes), array('i', word_ids)
+            hashes.byteswap()
+            word_ids.byteswap()
+        # writes to a temporary file first not to leave a broken index
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, len(hashes), stamp))
+                hashes.tofile(f)
+                word_ids.tofile(f)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load(cls, path: str, size: int, stamp: int) -> Optional['WordIdIndex']:
+        """ reads an index written by save
+
+        Args:
+            path: the file to read
+            size: the number of the words in the dictionary
+            stamp: the stamp of the dictionary computed by compute_stamp
+        Returns:
+            WordIdIndex, or None if the file does not exist or is not of the dictionary
+        """
+        try:
+            with open(path, 'rb') as f:
+                magic, version, n_words, file_stamp = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != _MAGIC or version != _FORMAT_VERSION or n_words != size or file_stamp != stamp:
+                    return None
+                hashes, word_ids = array('I'), array('i')
+                hashes.fromfile(f, n_words)
+                word_ids.fromfile(f, n_words)
+        except (OSError, EOFError, struct.error):
+            return None
+        if sys.byteorder != 'little':
+            hashes.byteswap()
+            word_ids.byteswap()
+        return cls(hashes, word_ids)
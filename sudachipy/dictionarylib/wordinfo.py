@@ -40,3 +40,90 @@ class WordInfo:
 
     def length(self):
         return self.head_word_length
+
+
+class _LazyField(object):
+    """ decodes fields on first access and stores them in the instance
+
+    The values shadow these non-data descriptors afterwards, so later reads
+    and assignments are plain attribute accesses.
+    """
+
+    def __init__(self, name, decode):
+        self.name = name
+        self.decode = decode
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        self.decode(instance)
+        return instance.__dict__[self.name]
+
+
+class LazyWordInfo(WordInfo):
+    """ WordInfo reading the dictionary on demand
+
+    The surface, the length and the part-of-speech are read at once. The
+    other fields are read together on first access to any of them, and
+    the dictionary form, which needs another record, on its own. The
+    fields not read yet cannot be read after the dictionary is closed.
+
+    Attributes:
+        _word_info_list: WordInfoList containing the record
+        _word_id: word ID in the dictionary
+        _rest_offset: the offset of the normalized form in the dictionary
+
+    """
+
+    def __init__(self, word_info_list, word_id):
+        self._word_info_list = word_info_list
+        self._word_id = word_id
+        # reads by absolute offsets, not by seek() and read(), because the
+        # position of the mmap object is shared by all threads
+        offset = word_info_list.word_id_to_offset(word_id)
+        self.surface, offset = word_info_list.buffer_to_string(offset)
+        self.head_word_length, offset = word_info_list.buffer_to_string_length(offset)
+        self.pos_id = int.from_bytes(word_info_list.bytes[offset:offset + 2], 'little')
+        self._rest_offset = offset + 2
+
+    def _check_open(self):
+        # a closed mmap object raises a ValueError not telling which
+        if getattr(self._word_info_list.bytes, 'closed', False):
+            raise ValueError('the dictionary of word {} is closed; read the fields before closing it'
+                             .format(self._word_id))
+
+    def _read_rest(self):
+        self._check_open()
+        # fields assigned before are kept
+        fields = self.__dict__
+        list_ = self._word_info_list
+        normalized_form, offset = list_.buffer_to_string(self._rest_offset)
+        fields.setdefault('normalized_form', normalized_form or self.surface)
+        fields.setdefault('dictionary_form_word_id', int.from_bytes(list_.bytes[offset:offset + 4], 'little', signed=True))
+        reading_form, offset = list_.buffer_to_string(offset + 4)
+        fields.setdefault('reading_form', reading_form or self.surface)
+        a_unit_split, offset = list_.buffer_to_int_array(offset)
+        fields.setdefault('a_unit_split', a_unit_split)
+        b_unit_split, offset = list_.buffer_to_int_array(offset)
+        fields.setdefault('b_unit_split', b_unit_split)
+        word_structure, offset = list_.buffer_to_int_array(offset)
+        fields.setdefault('word_structure', word_structure)
+        fields.setdefault('synonym_group_ids', list_.buffer_to_int_array(offset)[0] if list_.has_synonym_gid else [])
+
+    normalized_form = _LazyField('normalized_form', _read_rest)
+    dictionary_form_word_id = _LazyField('dictionary_form_word_id', _read_rest)
+    reading_form = _LazyField('reading_form', _read_rest)
+    a_unit_split = _LazyField('a_unit_split', _read_rest)
+    b_unit_split = _LazyField('b_unit_split', _read_rest)
+    word_structure = _LazyField('word_structure', _read_rest)
+    synonym_group_ids = _LazyField('synonym_group_ids', _read_rest)
+
+    def _read_dictionary_form(self):
+        word_id = self.dictionary_form_word_id
+        if word_id >= 0 and word_id != self._word_id:
+            self._check_open()
+            self.__dict__['dictionary_form'] = self._word_info_list.get_word_info(word_id).surface
+        else:
+            self.__dict__['dictionary_form'] = self.surface
+
+    dictionary_form = _LazyField('dictionary_form', _read_dictionary_form)
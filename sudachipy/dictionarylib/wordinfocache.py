@@ -0,0 +1,85 @@
+# Copyright (c) 2019 Works Applications Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize', 'pinned'])
+
+
+class WordInfoCache(object):
+    """ LRU cache of WordInfo keyed by word ID
+
+    Pinned entries are kept apart from the LRU entries and are never evicted.
+
+    Attributes:
+        maxsize: the maximum number of the LRU entries. 0 disables the cache.
+        hits: the number of lookups found in the cache
+        misses: the number of lookups not found in the cache
+        evictions: the number of entries dropped to keep maxsize
+
+    """
+
+    def __init__(self, maxsize: int):
+        if maxsize < 0:
+            raise ValueError('maxsize must not be negative')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._pinned = {}
+        self._lock = threading.Lock()
+
+    def get(self, word_id: int):
+        with self._lock:
+            info = self._pinned.get(word_id)
+            if info is None:
+                info = self._entries.get(word_id)
+                if info is None:
+                    self.misses += 1
+                    return None
+                self._entries.move_to_end(word_id)
+            self.hits += 1
+            return info
+
+    def put(self, word_id: int, info) -> None:
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            if word_id in self._pinned:
+                return
+            self._entries[word_id] = info
+            self._entries.move_to_end(word_id)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pin(self, word_id: int, info) -> None:
+        with self._lock:
+            self._entries.pop(word_id, None)
+            self._pinned[word_id] = info
+
+    def clear(self) -> None:
+        """ drops all entries including pinned ones and resets the statistics """
+        with self._lock:
+            self._entries.clear()
+            self._pinned.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def cache_info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._entries), len(self._pinned))
@@ -12,9 +12,21 @@ cdef class Lattice:
     cdef list end_lists
     cdef object grammar
     cdef object eos_params
-    cdef const short[:,:] connect_costs
+    cdef const short[:, ::1] connect_costs
+    cdef int gathered_begin
+    cdef int gathered_size
+    cdef int n_gathered
+    cdef int gathered_capacity
+    cdef int* gathered_right_ids
+    cdef int* gathered_costs
+    cdef int* gathered_indices
+    cdef list node_pool
+    cdef int n_pooled_nodes
 
     cpdef void resize(self, int size)
-    cpdef void insert(self, int begin, int end, LatticeNode node)
-    cdef void connect_node(self, LatticeNode r_node)
-    cdef void connect_eos_node(self)
+    cpdef void insert(self, int begin, int end, LatticeNode node) except *
+    cdef LatticeNode new_node(self, object lexicon, int left_id, int right_id, int cost, long long word_id)
+    cpdef list detach_path(self, list path)
+    cdef void gather_left_nodes(self, int begin) except *
+    cdef void connect_node(self, LatticeNode r_node) except *
+    cdef void connect_eos_node(self) except *
@@ -12,11 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from heapq import heappop, heappush
 from typing import List, Optional
 
+from libc.stdlib cimport free, realloc
+
 from .dictionarylib.grammar import Grammar
 from .latticenode cimport LatticeNode
 
+# the capacity in bytes kept by clear()
+_MAX_RETAINED_CAPACITY = 1 << 16
+# the number of pooled nodes kept by clear()
+_MAX_RETAINED_NODES = 1 << 16
+
 cdef class Lattice:
 
     def __init__(self, grammar: Grammar):
@@ -33,11 +41,20 @@ cdef class Lattice:
         bos_node.is_connected_to_bos = True
         self.end_lists.append([bos_node])
         self.connect_costs = self.grammar._matrix_view
+        self.node_pool = []
+        self.n_pooled_nodes = 0
+        self.gathered_begin = -1
+
+    def __dealloc__(self):
+        free(self.gathered_right_ids)
+        free(self.gathered_costs)
+        free(self.gathered_indices)
 
     cpdef void resize(self, int size):
         if size > self.capacity:
             self.expand(size)
         self.size = size
+        self.gathered_begin = -1
         self.eos_node = LatticeNode()
         self.eos_node.set_parameter(self.eos_params[0], self.eos_params[1], self.eos_params[2])
         self.eos_node.begin = self.eos_node.end = size
@@ -45,11 +62,18 @@ cdef class Lattice:
     def clear(self) -> None:
         for i in range(1, self.size + 1):
             self.end_lists[i].clear()
+        if self.capacity > _MAX_RETAINED_CAPACITY:  # do not keep the lattice of a huge input
+            del self.end_lists[_MAX_RETAINED_CAPACITY + 1:]
+            self.capacity = _MAX_RETAINED_CAPACITY
+        if len(self.node_pool) > _MAX_RETAINED_NODES:
+            del self.node_pool[_MAX_RETAINED_NODES:]
+        self.n_pooled_nodes = 0
+        self.gathered_begin = -1
         self.size = 0
         self.eos_node = None
 
     def expand(self, new_size: int) -> None:
-        expand_list = [[] for _ in range(self.size, new_size)]
+        expand_list = [[] for _ in range(self.capacity, new_size)]
         self.end_lists.extend(expand_list)
         self.capacity = new_size
 
@@ -69,45 +93,133 @@ cdef class Lattice:
                 min_arg = node
         return min_arg
 
-    cpdef void insert(self, int begin, int end, LatticeNode node):
+    cpdef void insert(self, int begin, int end, LatticeNode node) except *:
         self.end_lists[end].append(node)
+        if end == self.gathered_begin:
+            self.gathered_begin = -1
         node.begin = begin
         node.end = end
         self.connect_node(node)
 
     def remove(self, begin: int, end: int, node: LatticeNode) -> None:
         self.end_lists[end].remove(node)
+        if end == self.gathered_begin:
+            self.gathered_begin = -1
 
     @staticmethod
     def create_node() -> LatticeNode:
         return LatticeNode()
 
+    cdef LatticeNode new_node(self, object lexicon, int left_id, int right_id, int cost, long long word_id):
+        """ returns a node of a dictionary word from the node pool
+
+        The pooled nodes are reused after clear(), so a node must be
+        detached by detach_path to be used after that.
+        """
+        cdef LatticeNode node
+        if self.n_pooled_nodes < len(self.node_pool):
+            node = self.node_pool[self.n_pooled_nodes]
+            node.best_previous_node = None
+        else:
+            node = LatticeNode.__new__(LatticeNode)
+            node.is_pooled = True
+            node._is_defined = True
+            self.node_pool.append(node)
+        self.n_pooled_nodes += 1
+        node.lexicon = lexicon
+        node.left_id = left_id
+        node.right_id = right_id
+        node.cost = cost
+        node.word_id = word_id
+        return node
+
+    cpdef list detach_path(self, list path):
+        """ returns the path with its pooled nodes replaced by copies
+
+        Args:
+            path: nodes of this lattice
+        Returns:
+            list of nodes which stay valid after clear()
+
+        """
+        cdef LatticeNode node, copy
+        result = []
+        for node in path:
+            if node.is_pooled:
+                copy = LatticeNode(node.lexicon, node.left_id, node.right_id, node.cost, node.word_id)
+                copy.begin = node.begin
+                copy.end = node.end
+                copy.total_cost = node.total_cost
+                copy.is_connected_to_bos = node.is_connected_to_bos
+                node = copy
+            result.append(node)
+        return result
+
     def has_previous_node(self, index: int) -> bool:
         return bool(self.end_lists[index])
 
-    cdef void connect_node(self, LatticeNode r_node):
-        begin = r_node.begin
-        r_node.total_cost = INT_MAX
+    cdef void gather_left_nodes(self, int begin) except *:
+        """ copies the IDs and the costs of the nodes ending at begin into C arrays
 
+        The nodes beginning at the same position connect to the same left
+        nodes, so the arrays are reused until a node ending at begin is
+        inserted or removed.
+        """
+        cdef list l_nodes = self.end_lists[begin]
+        cdef int size = len(l_nodes)
+        cdef int i, n = 0
+        cdef Py_ssize_t right_id_size = self.connect_costs.shape[1]
         cdef LatticeNode l_node
-        cdef int connect_cost
-        for l_node in self.end_lists[begin]:
+        self.gathered_begin = -1
+        if size > self.gathered_capacity:
+            self.gathered_right_ids = <int*> realloc(self.gathered_right_ids, size * sizeof(int))
+            self.gathered_costs = <int*> realloc(self.gathered_costs, size * sizeof(int))
+            self.gathered_indices = <int*> realloc(self.gathered_indices, size * sizeof(int))
+            if not (self.gathered_right_ids and self.gathered_costs and self.gathered_indices):
+                raise MemoryError()
+            self.gathered_capacity = size
+        for i in range(size):
+            l_node = l_nodes[i]
             if not l_node.is_connected_to_bos:
                 continue
-            connect_cost = self.connect_costs[r_node.left_id, l_node.right_id]
+            if not 0 <= l_node.right_id < right_id_size:
+                raise IndexError('right-ID {} is out of the connection matrix'.format(l_node.right_id))
+            self.gathered_right_ids[n] = l_node.right_id
+            self.gathered_costs[n] = l_node.total_cost
+            self.gathered_indices[n] = i
+            n += 1
+        self.n_gathered = n
+        self.gathered_size = size
+        self.gathered_begin = begin
+
+    cdef void connect_node(self, LatticeNode r_node) except *:
+        cdef int begin = r_node.begin
+        if begin != self.gathered_begin or len(self.end_lists[begin]) != self.gathered_size:
+            self.gather_left_nodes(begin)
+
+        # the row of the connection costs to the left-ID of r_node
+        cdef const short* row = &self.connect_costs[r_node.left_id, 0]
+        cdef int i, connect_cost, cost
+        cdef int best_cost = INT_MAX
+        cdef int best = -1
+        for i in range(self.n_gathered):
+            connect_cost = row[self.gathered_right_ids[i]]
 
             # 0x7fff == Grammar.INHIBITED_CONNECTION:
             if connect_cost == 0x7fff:
                 continue
-            cost = l_node.total_cost + connect_cost
-            if cost < r_node.total_cost:
-                r_node.total_cost = cost
-                r_node.best_previous_node = l_node
+            cost = self.gathered_costs[i] + connect_cost
+            if cost < best_cost:
+                best_cost = cost
+                best = i
 
+        if best >= 0:
+            r_node.best_previous_node = self.end_lists[begin][self.gathered_indices[best]]
+        r_node.total_cost = best_cost
         r_node.is_connected_to_bos = r_node.best_previous_node is not None
         r_node.total_cost += r_node.cost
 
-    cdef void connect_eos_node(self):
+    cdef void connect_eos_node(self) except *:
         self.connect_node(self.eos_node)
 
     def get_best_path(self) -> List[LatticeNode]:
@@ -121,6 +233,57 @@ cdef class Lattice:
             node = node.best_previous_node
         return list(reversed(result))
 
+    def get_nbest_paths(self, int n) -> List[List[LatticeNode]]:
+        """ returns up to n paths in ascending order of the cost
+
+        The paths are searched backward from EOS with A*. The heuristic is
+        the cost of the best path from BOS computed by connect_node, which
+        is exact, so the paths are found in order. A node is expanded at
+        most n times, because the k-th best path through a node continues
+        with one of the n best paths to EOS from the node.
+
+        Args:
+            n: the maximum number of paths
+        Returns:
+            list of paths without BOS and EOS
+
+        """
+        if not self.eos_node.is_connected_to_bos:    # EOS node
+            raise AttributeError("EOS is not connected to BOS")
+        cdef LatticeNode bos_node = self.end_lists[0][0]
+        cdef LatticeNode r_node, l_node
+        cdef int connect_cost, cost, suffix_cost
+        cdef int seq = 0
+        paths = []
+        n_expanded = {}
+        # (estimated total cost, sequence number, cost after the node, node, nodes after the node)
+        heap = [(self.eos_node.total_cost, seq, 0, self.eos_node, None)]
+        while heap and len(paths) < n:
+            _, _, suffix_cost, r_node, suffix = heappop(heap)
+            if r_node is bos_node:
+                path = []
+                while suffix is not None:
+                    node, suffix = suffix
+                    path.append(node)
+                paths.append(path)
+                continue
+            count = n_expanded.get(r_node, 0)
+            if count >= n:
+                continue
+            n_expanded[r_node] = count + 1
+            if r_node is not self.eos_node:
+                suffix = (r_node, suffix)
+            for l_node in self.end_lists[r_node.begin]:
+                if not l_node.is_connected_to_bos:
+                    continue
+                connect_cost = self.connect_costs[r_node.left_id, l_node.right_id]
+                if connect_cost == 0x7fff:
+                    continue
+                cost = suffix_cost + connect_cost + r_node.cost
+                seq += 1
+                heappush(heap, (cost + l_node.total_cost, seq, cost, l_node, suffix))
+        return paths
+
     def dump(self, logger):
         if logger.disabled:
             return
@@ -2,10 +2,10 @@ cdef class LatticeNode:
 
     cdef int begin
     cdef int end
-    cdef int total_cost
-    cdef int word_id
+    cdef readonly int total_cost
+    cdef long long word_id
     cdef bint _is_oov
-    cdef LatticeNode best_previous_node
+    cdef readonly LatticeNode best_previous_node
     cdef bint is_connected_to_bos
     cdef object extra_word_info
     cdef object undefined_word_info
@@ -14,4 +14,5 @@ cdef class LatticeNode:
     cdef int left_id
     cdef int right_id
     cdef int cost
+    cdef bint is_pooled
 
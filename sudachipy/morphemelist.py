@@ -12,10 +12,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from array import array
+from collections import namedtuple
+
 from . import latticenode
 from . import morpheme
 from . import tokenizer
 
+MorphemeArrays = namedtuple('MorphemeArrays', [
+    'begin', 'end', 'word_id', 'part_of_speech_id', 'dictionary_id', 'is_oov'])
+# a C unit morpheme and its B and A unit morphemes
+MorphemeUnits = namedtuple('MorphemeUnits', ['c', 'b', 'a'])
+
 
 class MorphemeList:
 
@@ -23,11 +31,12 @@ class MorphemeList:
     def empty(cls):
         return MorphemeList(None, None, None, [])
 
-    def __init__(self, input_, grammar, lexicon, path):
+    def __init__(self, input_, grammar, lexicon, path, offset=0):
         self.input_text = input_
         self.grammar = grammar
         self.lexicon = lexicon
         self.path = path
+        self.offset = offset
 
     def __getitem__(self, index):
         n_morphs = len(self.path)
@@ -49,14 +58,14 @@ class MorphemeList:
         return ''.join([mm.surface() for mm in self])
 
     def get_begin(self, index):
-        return self.input_text.get_original_index(self.path[index].get_begin())
+        return self.input_text.get_original_index(self.path[index].get_begin()) + self.offset
 
     def get_end(self, index):
-        return self.input_text.get_original_index(self.path[index].get_end())
+        return self.input_text.get_original_index(self.path[index].get_end()) + self.offset
 
     def get_surface(self, index):
-        begin = self.get_begin(index)
-        end = self.get_end(index)
+        begin = self.input_text.get_original_index(self.path[index].get_begin())
+        end = self.input_text.get_original_index(self.path[index].get_end())
         return self.input_text.get_original_text()[begin:end]
 
     def get_word_info(self, index):
@@ -64,25 +73,61 @@ class MorphemeList:
 
     def split(self, mode, index, wi):
         if mode is tokenizer.Tokenizer.SplitMode.A:
-            word_ids = wi.a_unit_split
+            a_unit = True
         elif mode is tokenizer.Tokenizer.SplitMode.B:
-            word_ids = wi.b_unit_split
+            a_unit = False
         else:
             return [self.__getitem__(index)]
 
-        if len(word_ids) == 0 or len(word_ids) == 1:
+        node = self.path[index]
+        if node.get_dictionary_id() < 0:
+            split = self.lexicon.split_word_info(wi, a_unit)
+        else:
+            split = self.lexicon.get_split(node.get_word_id(), a_unit)
+        if not split:
             return [self.__getitem__(index)]
 
-        offset = self.path[index].get_begin()
+        offset = node.get_begin()
         nodes = []
-        for wid in word_ids:
+        for wid, length in split:
             n = latticenode.LatticeNode(self.lexicon, 0, 0, 0, wid)
-            n.set_begin(offset)
-            offset += n.get_word_info().head_word_length
-            n.set_end(offset)
+            n.set_range(offset, offset + length)
+            offset += length
             nodes.append(n)
 
-        return MorphemeList(self.input_text, self.grammar, self.lexicon, nodes)
+        return MorphemeList(self.input_text, self.grammar, self.lexicon, nodes, self.offset)
+
+    def to_arrays(self, as_numpy=False) -> MorphemeArrays:
+        """ returns the morphemes as parallel arrays
+
+        Args:
+            as_numpy: returns NumPy arrays instead of array.array. NumPy is required.
+        Returns:
+            MorphemeArrays of begin and end offsets in the original text, word IDs,
+            part-of-speech IDs, dictionary IDs and OOV flags (1 for OOV)
+
+        """
+        begins = array('i')
+        ends = array('i')
+        word_ids = array('q')
+        pos_ids = array('i')
+        dictionary_ids = array('i')
+        oovs = array('b')
+        if self.path:
+            get_original_index = self.input_text.get_original_index
+            offset = self.offset
+            for node in self.path:
+                begins.append(get_original_index(node.get_begin()) + offset)
+                ends.append(get_original_index(node.get_end()) + offset)
+                word_ids.append(node.get_word_id())
+                pos_ids.append(node.get_word_info().pos_id)
+                dictionary_ids.append(node.get_dictionary_id())
+                oovs.append(node.is_oov())
+        arrays = MorphemeArrays(begins, ends, word_ids, pos_ids, dictionary_ids, oovs)
+        if as_numpy:
+            import numpy
+            return MorphemeArrays(*(numpy.frombuffer(a, dtype=a.typecode) for a in arrays))
+        return arrays
 
     def is_oov(self, index):
         return self.path[index].is_oov()
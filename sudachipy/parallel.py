@@ -0,0 +1,163 @@
+# Copyright (c) 2019 Works Applications Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import multiprocessing
+import os
+import queue
+from collections import deque, namedtuple
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+from .morphemelist import MorphemeList
+
+MorphemeRecord = namedtuple('MorphemeRecord', [
+    'surface', 'begin', 'end', 'part_of_speech', 'normalized_form',
+    'dictionary_form', 'reading_form', 'dictionary_id', 'is_oov'])
+
+_worker_tokenizer = None
+_worker_formatter = None
+
+
+def to_records(morphemes: MorphemeList) -> List[MorphemeRecord]:
+    """ the default formatter of TokenizerPool
+
+    MorphemeList refers to the dictionary of the worker, so it cannot be
+    sent back to the parent process as is.
+    """
+    return [MorphemeRecord(m.surface(), m.begin(), m.end(), tuple(m.part_of_speech()), m.normalized_form(),
+                           m.dictionary_form(), m.reading_form(), m.dictionary_id(), m.is_oov())
+            for m in morphemes]
+
+
+def _init_worker(dict_, mode, formatter) -> None:
+    global _worker_tokenizer, _worker_formatter
+    _worker_tokenizer = dict_.create(mode)
+    _worker_formatter = formatter
+
+
+def _tokenize_chunk(texts: List[str]) -> list:
+    return [_worker_formatter(ms) for ms in _worker_tokenizer.tokenize_iter(texts)]
+
+
+def _chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class TokenizerPool:
+    """ multi-process tokenizer sharing one Dictionary
+
+    Worker processes are forked from a loaded Dictionary, so they share the
+    mmapped dictionaries and the parsed character definitions, rewrite lists
+    and unknown word definitions with the parent instead of reading them again.
+
+    Attributes:
+        _chunksize:
+            the number of texts sent to a worker at once
+        _max_pending:
+            the maximum number of chunks in flight. Input is consumed
+            lazily, so a slow consumer never makes the pool buffer the corpus.
+        _pool:
+            multiprocessing.Pool of forked workers
+
+    """
+
+    def __init__(self, dict_, processes: int = None, mode=None, chunksize: int = 64,
+                 max_pending: int = None, formatter: Callable[[MorphemeList], object] = to_records):
+        """ Constructs a pool.
+
+        Args:
+            dict_: loaded Dictionary shared by the workers
+            processes: the number of workers (default: os.cpu_count())
+            mode: split mode of the workers' tokenizers
+            chunksize: the number of texts sent to a worker at once
+            max_pending: the maximum number of chunks in flight (default: 2 * processes)
+            formatter: converts a MorphemeList into a picklable result in the worker
+
+        """
+        try:
+            context = multiprocessing.get_context('fork')
+        except ValueError:
+            raise RuntimeError('TokenizerPool requires the fork start method')
+        if chunksize < 1:
+            raise ValueError('chunksize must be positive')
+        processes = processes or os.cpu_count() or 1
+        self._chunksize = chunksize
+        self._max_pending = max_pending or 2 * processes
+        self._pool = context.Pool(processes, initializer=_init_worker, initargs=(dict_, mode, formatter))
+
+    def tokenize_batch(self, texts: Iterable[str]) -> list:
+        """ tokenize texts and returns the results in input order """
+        return list(self.tokenize_iter(texts))
+
+    def tokenize_iter(self, texts: Iterable[str]) -> Iterator:
+        """ tokenize texts and yields the results in input order """
+        pending = deque()
+        for chunk in _chunked(texts, self._chunksize):
+            pending.append(self._pool.apply_async(_tokenize_chunk, (chunk,)))
+            if len(pending) >= self._max_pending:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+    def tokenize_iter_unordered(self, texts: Iterable[str]) -> Iterator[Tuple[int, object]]:
+        """ tokenize texts and yields (index of the text, result) in completion order """
+        done = queue.Queue()
+        n_pending = 0
+        offset = 0
+        for chunk in _chunked(texts, self._chunksize):
+            self._submit_indexed(chunk, offset, done)
+            offset += len(chunk)
+            n_pending += 1
+            if n_pending >= self._max_pending:
+                yield from self._take(done)
+                n_pending -= 1
+        while n_pending:
+            yield from self._take(done)
+            n_pending -= 1
+
+    def _submit_indexed(self, chunk: List[str], offset: int, done: queue.Queue) -> None:
+        self._pool.apply_async(_tokenize_chunk, (chunk,),
+                               callback=lambda results: done.put((offset, results)),
+                               error_callback=done.put)
+
+    @staticmethod
+    def _take(done: queue.Queue) -> Iterator[Tuple[int, object]]:
+        item = done.get()
+        if isinstance(item, BaseException):
+            raise item
+        offset, results = item
+        for i, result in enumerate(results):
+            yield offset + i, result
+
+    def close(self) -> None:
+        self._pool.close()
+        self._pool.join()
+
+    def terminate(self) -> None:
+        self._pool.terminate()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
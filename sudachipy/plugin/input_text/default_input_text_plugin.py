@@ -13,39 +13,134 @@
 # limitations under the License.
 
 import os
+import re
+from functools import lru_cache
 from unicodedata import normalize
 
+try:
+    from unicodedata import is_normalized
+except ImportError:  # Python < 3.8
+    is_normalized = None
+
 from sudachipy import config
 
 from . import InputTextPlugin
 
+_BMP_SIZE = 0x10000
+# the number of the characters out of the BMP whose normalization is cached
+_OUTSIDE_BMP_CACHE_SIZE = 1024
+# the maximum number of the characters searched for by the fast path
+_MAX_KEY_CHARS_IN_FAST_PATH = 8
+
+
+def _to_char_class(code_points) -> str:
+    ranges = []
+    for cp in sorted(code_points):
+        if ranges and ranges[-1][1] == cp - 1:
+            ranges[-1][1] = cp
+        else:
+            ranges.append([cp, cp])
+    return ''.join(re.escape(chr(b)) if b == e else '{}-{}'.format(re.escape(chr(b)), re.escape(chr(e)))
+                   for b, e in ranges)
+
 
 class DefaultInputTextPlugin(InputTextPlugin):
-    def __init__(self):
+    """ normalizes the input text with rewrite.def, lowercasing and NFKC
+
+    The rewrite lists and the normalization of the characters in the BMP
+    are compiled by set_up into a table and a regular expression matching
+    only the text to rewrite, so the characters kept as they are, like
+    ASCII lowercase letters and kana, are skipped in bulk. The
+    normalization of the other characters is cached.
+
+    A lowercase text in NFKC needs no rewriting unless it contains a
+    replaced string, so such a text is returned before scanning it.
+
+    The rewrite lists are read from the file named by rewriteDef in the
+    resource directory, or from rewrite.def of the package by default.
+
+    Attributes:
+        rewrite_def: the path of the rewrite lists
+        ignore_normalize_set: the characters only lowercased
+        key_lengths: the maximum length of the replaced strings by their first character
+        replace_char_map: the replaced strings and their replacements
+        _normalize_table: the normalized strings of the BMP characters changed by the normalization
+        _pattern: matches a character in _normalize_table, a character out of the BMP, or
+            a character which may begin a replaced string
+        _normalize_outside_bmp: the normalization of a character out of the BMP with an LRU cache
+        _key_chars_in_normalized_text: a character of each replaced string which may appear in
+            a lowercase text in NFKC, or None to disable the fast path
+
+    """
+
+    def __init__(self, json_obj=None):
+        self.rewrite_def = None
+        if json_obj and 'rewriteDef' in json_obj:
+            self.rewrite_def = os.path.join(config.settings.resource_dir, json_obj['rewriteDef'])
         self.ignore_normalize_set = set()
         self.key_lengths = {}
         self.replace_char_map = {}
+        self._normalize_table = {}
+        self._pattern = None
+        self._normalize_outside_bmp = None
+        self._key_chars_in_normalized_text = None
 
     def set_up(self) -> None:
-        rewrite_def = os.path.join(config.DEFAULT_RESOURCEDIR, "rewrite.def")
-        if not rewrite_def:
-            raise AttributeError("rewriteDef is not defined")
-        self.read_rewrite_lists(rewrite_def)
+        if self.rewrite_def is None:
+            self.rewrite_def = os.path.join(config.DEFAULT_RESOURCEDIR, "rewrite.def")
+        self.read_rewrite_lists(self.rewrite_def)
+        self._compile()
+
+    def _compile(self) -> None:
+        table = {}
+        for cp in range(_BMP_SIZE):
+            c = chr(cp)
+            normalized = self._normalize_char(c)
+            if normalized != c:
+                table[c] = normalized
+        self._normalize_table = table
+        code_points = {ord(c) for c in table}
+        code_points.update(ord(key) for key in self.replace_char_map if len(key) == 1)
+        pattern = '[{}\\U00010000-\\U0010FFFF]'.format(_to_char_class(code_points))
+        # the first characters of the longer replaced strings only if their second ones follow
+        keys = [key for key in self.replace_char_map if len(key) > 1]
+        if keys:
+            pattern += '|[{}](?=[{}])'.format(_to_char_class({ord(key[0]) for key in keys}),
+                                              _to_char_class({ord(key[1]) for key in keys}))
+        self._pattern = re.compile(pattern)
+        self._normalize_outside_bmp = lru_cache(maxsize=_OUTSIDE_BMP_CACHE_SIZE)(self._normalize_char)
+
+        # a character changed by lowercasing or NFKC never appears in a lowercase text in NFKC
+        key_chars = {key[-1] for key in self.replace_char_map
+                     if all(c.lower() == c and normalize("NFKC", c) == c for c in key)}
+        if is_normalized is not None and len(key_chars) <= _MAX_KEY_CHARS_IN_FAST_PATH:
+            self._key_chars_in_normalized_text = key_chars
+        else:
+            self._key_chars_in_normalized_text = None
+
+    def _normalize_char(self, c: str) -> str:
+        # 2-1. capital alphabet (not only Latin but Greek, Cyrillic, etc.) -> small
+        lower = c.lower()
+        if lower in self.ignore_normalize_set:
+            return lower
+        # 2-2. normalize (except in ignoreNormalize)
+        #   e.g. full-width alphabet -> half-width / ligature / etc.
+        return normalize("NFKC", lower)
 
     def rewrite(self, builder: InputTextPlugin.Builder) -> None:
-        offset = 0
-        next_offset = 0
+        if self._pattern is None:
+            self._compile()
         text = builder.get_text()
-
-        i = -1
-        while True:
-            i += 1
-            if i >= len(text):
-                break
-            textloop = False
-            offset += next_offset
-            next_offset = 0
+        if self._is_normalized(text):
+            return
+        offset = 0
+        next_index = 0
+        for m in self._pattern.finditer(text):
+            i = m.start()
+            if i < next_index:  # in the string replaced by 1.
+                continue
             original = text[i]
+            next_index = i + 1
 
             # 1. replace char without normalize
             max_length = min(self.key_lengths.get(original, 0), len(text) - i)
@@ -53,27 +148,36 @@ class DefaultInputTextPlugin(InputTextPlugin):
                 replace = self.replace_char_map.get(text[i:i + l])
                 if replace:
                     builder.replace(i + offset, i + l + offset, replace)
-                    next_offset += len(replace) - l
-                    i += l - 1
-                    textloop = True
+                    offset += len(replace) - l
+                    next_index = i + l
                     break
-            if textloop:
-                continue
-
-            # 2. normalize
-            # 2-1. capital alphabet (not only Latin but Greek, Cyrillic, etc.) -> small
-            lower = original.lower()
-            if lower in self.ignore_normalize_set:
-                if original == lower:
-                    continue
-                replace = lower
             else:
-                # 2-2. normalize (except in ignoreNormalize)
-                #   e.g. full-width alphabet -> half-width / ligature / etc.
-                replace = normalize("NFKC", lower)
-            next_offset = len(replace) - 1
-            if original != replace:
+                # 2. normalize
+                replace = self._normalize_table.get(original)
+                if replace is None:
+                    if ord(original) < _BMP_SIZE:
+                        continue
+                    replace = self._normalize_outside_bmp(original)
+                    if replace == original:
+                        continue
                 builder.replace(i + offset, i + 1 + offset, replace)
+                offset += len(replace) - 1
+
+    def _is_normalized(self, text: str) -> bool:
+        key_chars = self._key_chars_in_normalized_text
+        return key_chars is not None and is_normalized("NFKC", text) and text == text.lower() \
+            and not any(c in text for c in key_chars)
+
+    def normalize_cache_info(self):
+        """ returns the statistics of the cache of the characters out of the BMP
+
+        Returns:
+            functools' CacheInfo of hits, misses, maxsize and currsize
+
+        """
+        if self._normalize_outside_bmp is None:
+            self._compile()
+        return self._normalize_outside_bmp.cache_info()
 
     def read_rewrite_lists(self, rewrite_def):
         with open(rewrite_def, "r", encoding="utf-8") as f:
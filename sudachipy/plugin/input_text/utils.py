@@ -23,7 +23,7 @@ def get_input_text_plugin(json_obj) -> InputTextPlugin:
     # In the future, users can define plugin by themselves
     try:
         if json_obj['class'] == 'sudachipy.plugin.input_text.DefaultInputTextPlugin':
-            return DefaultInputTextPlugin()
+            return DefaultInputTextPlugin(json_obj)
         if json_obj['class'] == 'sudachipy.plugin.input_text.ProlongedSoundMarkInputTextPlugin':
             return ProlongedSoundMarkInputTextPlugin(json_obj)
         raise ValueError('{} is invalid InputTextPlugin class'.format(json_obj['class']))
@@ -63,10 +63,10 @@ class MeCabOovPlugin(OovProviderPlugin):
         if length < 1:
             return []
         nodes = []
-        for type_ in input_text.get_char_category_types(offset):
-            if type_ not in self.categories:
+        mask = input_text.get_char_category_mask(offset)
+        for type_, cinfo in self.categories.items():
+            if not mask & type_.value:
                 continue
-            cinfo = self.categories[type_]
             llength = length
             if cinfo.type_ not in self.oov_list:
                 continue
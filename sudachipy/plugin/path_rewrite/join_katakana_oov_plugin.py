@@ -69,14 +69,14 @@ class JoinKatakanaOovPlugin(PathRewritePlugin):
             i += 1
 
     def is_katakana_node(self, text, node):
-        return CategoryType.KATAKANA in self.get_char_category_types(text, node)
+        return bool(self.get_char_category_mask(text, node) & CategoryType.KATAKANA.value)
 
     def is_one_char(self, text, node):
         b = node.get_begin()
         return b + text.get_code_points_offset_length(b, 1) == node.get_end()
 
     def can_oov_bow_node(self, text, node):
-        return CategoryType.NOOOVBOW not in text.get_char_category_types(node.get_begin())
+        return not text.get_char_category_mask(node.get_begin()) & CategoryType.NOOOVBOW.value
 
     @staticmethod
     def is_shorter(length: int, text: UTF8InputText, node: LatticeNode):
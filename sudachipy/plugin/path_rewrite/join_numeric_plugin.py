@@ -19,6 +19,8 @@ from sudachipy.dictionarylib.categorytype import CategoryType
 from .numericparser import NumericParser
 from .path_rewrite_plugin import PathRewritePlugin
 
+_NUMERIC_MASK = CategoryType.NUMERIC.value | CategoryType.KANJINUMERIC.value
+
 
 class JoinNumericPlugin(PathRewritePlugin):
 
@@ -47,9 +49,9 @@ class JoinNumericPlugin(PathRewritePlugin):
         while i < len(path) - 1:
             i += 1
             node = path[i]
-            types = self.get_char_category_types(text, node)
+            mask = self.get_char_category_mask(text, node)
             s = node.get_word_info().normalized_form
-            if CategoryType.NUMERIC in types or CategoryType.KANJINUMERIC in types or \
+            if mask & _NUMERIC_MASK or \
                (period_as_digit and s == '.') or (comma_as_digit and s == ','):
 
                 if begin_index < 0:
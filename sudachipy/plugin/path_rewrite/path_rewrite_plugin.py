@@ -89,3 +89,6 @@ class PathRewritePlugin(ABC):
 
     def get_char_category_types(self, text, node):
         return text.get_char_category_types(node.get_begin(), node.get_end())
+
+    def get_char_category_mask(self, text, node):
+        return text.get_char_category_mask(node.get_begin(), node.get_end())
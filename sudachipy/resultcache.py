@@ -0,0 +1,340 @@
+# Copyright (c) 2019 Works Applications Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict, namedtuple
+from typing import Callable, List, Optional
+
+from .config import DEFAULT_RESULT_CACHE_DISK_SIZE
+from .dictionarylib.wordinfo import WordInfo
+from .latticenode import LatticeNode
+
+ResultCacheInfo = namedtuple('ResultCacheInfo', [
+    'hits', 'disk_hits', 'misses', 'evictions', 'disk_evictions', 'maxsize', 'currsize', 'disk_maxsize',
+    'disk_currsize'])
+
+# seconds to wait for another process writing to the store
+_BUSY_TIMEOUT = 30.0
+# the number of the hit rows whose recency is kept until the next write
+_MAX_PENDING_USED = 10000
+
+
+def encode_path(path: List[LatticeNode]) -> str:
+    """ encodes the nodes of a tokenization result as JSON
+
+    A dictionary word is stored by its word ID. A node having its own
+    WordInfo, like an OOV or a joined word, is stored with the WordInfo.
+    """
+    nodes = []
+    for node in path:
+        info = None
+        if node.get_dictionary_id() < 0:
+            wi = node.get_word_info()
+            info = [wi.surface, wi.head_word_length, wi.pos_id, wi.normalized_form, wi.dictionary_form_word_id,
+                    wi.dictionary_form, wi.reading_form, wi.a_unit_split, wi.b_unit_split, wi.word_structure,
+                    wi.synonym_group_ids]
+        nodes.append([node.get_begin(), node.get_end(), node.get_word_id(), node.get_left_id(),
+                      node.get_right_id(), node.get_path_cost(), node.is_oov(), info])
+    return json.dumps(nodes, ensure_ascii=False, separators=(',', ':'))
+
+
+def decode_path(data: str, lexicon) -> List[LatticeNode]:
+    """ restores the nodes encoded by encode_path """
+    path = []
+    for begin, end, word_id, left_id, right_id, cost, is_oov, info in json.loads(data):
+        node = LatticeNode(lexicon, left_id, right_id, cost, word_id)
+        node.set_range(begin, end)
+        if is_oov:
+            node.set_oov()
+        if info is not None:
+            node.set_word_info(WordInfo(*info))
+        path.append(node)
+    return path
+
+
+class _ResultStore(object):
+    """ sqlite table of encoded results
+
+    The least recently used rows are deleted when the table exceeds
+    maxsize. The database is in WAL mode and every put is committed in a
+    short transaction, so processes sharing the file do not lock each
+    other out and no result is lost if the store is not closed. A get
+    only reads; the recency of the hit rows is kept in memory and written
+    with the next put. Each thread has its own connection, so a get does
+    not wait for a put of another thread. The connections are opened again
+    in a forked process, because a sqlite connection must not be shared
+    with the parent.
+    """
+
+    def __init__(self, path: str, fingerprint: str, maxsize: int):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.maxsize = maxsize
+        self.evictions = 0
+        self._pid = None
+        self._local = threading.local()
+        self._connections = []
+        self._size = 0
+        self._clock = 0
+        self._used = OrderedDict()
+        # guards _used and _connections
+        self._lock = threading.Lock()
+        self._connect()
+
+    def _open(self) -> sqlite3.Connection:
+        # autocommit mode; the transactions are begun explicitly
+        connection = sqlite3.connect(self.path, timeout=_BUSY_TIMEOUT, isolation_level=None,
+                                     check_same_thread=False)
+        connection.execute('PRAGMA journal_mode = WAL')
+        connection.execute('PRAGMA synchronous = NORMAL')
+        return connection
+
+    def _connect(self) -> None:
+        connection = self._open()
+        connection.execute('CREATE TABLE IF NOT EXISTS results (fingerprint TEXT, mode TEXT, text TEXT, '
+                           'nodes TEXT, used INTEGER, PRIMARY KEY (fingerprint, mode, text))')
+        connection.execute('CREATE INDEX IF NOT EXISTS results_used ON results (fingerprint, used)')
+        self._size, self._clock = connection.execute(
+            'SELECT COUNT(*), IFNULL(MAX(used), 0) FROM results WHERE fingerprint = ?', (self.fingerprint,)).fetchone()
+        # the connections of the parent are left to the parent
+        self._local = threading.local()
+        self._local.connection = connection
+        self._connections = [connection]
+        self._pid = os.getpid()
+        # the hits of the parent are written by the parent
+        self._used.clear()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            self._lock = threading.Lock()
+            self._connect()
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._open()
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def get(self, mode: str, text: str) -> Optional[str]:
+        connection = self._get_connection()
+        row = connection.execute('SELECT nodes FROM results WHERE fingerprint = ? AND mode = ? AND text = ?',
+                                 (self.fingerprint, mode, text)).fetchone()
+        if row is None:
+            return None
+        key = (mode, text)
+        with self._lock:
+            self._used[key] = None
+            self._used.move_to_end(key)
+            if len(self._used) > _MAX_PENDING_USED:
+                # forgets the oldest hit, which only makes the row look older
+                self._used.popitem(last=False)
+        return row[0]
+
+    def put(self, mode: str, text: str, nodes: str) -> None:
+        connection = self._get_connection()
+        # the following is done by one thread or process at a time holding the write lock of the database
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            # continues the clock of the other processes writing to the store
+            self._clock = max(self._clock, connection.execute(
+                'SELECT IFNULL(MAX(used), 0) FROM results WHERE fingerprint = ?', (self.fingerprint,)).fetchone()[0])
+            self._write_used(connection)
+            self._clock += 1
+            cursor = connection.execute('INSERT OR IGNORE INTO results VALUES (?, ?, ?, ?, ?)',
+                                        (self.fingerprint, mode, text, nodes, self._clock))
+            self._size += cursor.rowcount
+            if self._size > self.maxsize:
+                self._evict(connection)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+    def _write_used(self, connection: sqlite3.Connection) -> None:
+        with self._lock:
+            used = list(self._used)
+            self._used.clear()
+        if not used:
+            return
+        clock = self._clock
+        connection.executemany('UPDATE results SET used = ? WHERE fingerprint = ? AND mode = ? AND text = ?',
+                               ((clock + i, self.fingerprint, mode, text)
+                                for i, (mode, text) in enumerate(used, 1)))
+        self._clock = clock + len(used)
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        # the other processes may have added or deleted rows
+        self._size = connection.execute('SELECT COUNT(*) FROM results WHERE fingerprint = ?',
+                                        (self.fingerprint,)).fetchone()[0]
+        if self._size <= self.maxsize:
+            return
+        # deletes a tenth of the rows at once not to delete for every put
+        n_deleted = self._size - self.maxsize + self.maxsize // 10
+        cursor = connection.execute('DELETE FROM results WHERE rowid IN (SELECT rowid FROM results '
+                                    'WHERE fingerprint = ? ORDER BY used LIMIT ?)', (self.fingerprint, n_deleted))
+        self._size -= cursor.rowcount
+        self.evictions += cursor.rowcount
+
+    def size(self) -> int:
+        return self._size
+
+    def clear(self) -> None:
+        connection = self._get_connection()
+        connection.execute('DELETE FROM results WHERE fingerprint = ?', (self.fingerprint,))
+        self._size = 0
+        self.evictions = 0
+        with self._lock:
+            self._used.clear()
+
+    def close(self) -> None:
+        if self._connections and self._pid == os.getpid():
+            if self._used:
+                connection = self._get_connection()
+                connection.execute('BEGIN IMMEDIATE')
+                self._write_used(connection)
+                connection.execute('COMMIT')
+            with self._lock:
+                connections = self._connections
+                self._connections = []
+            for connection in connections:
+                connection.close()
+        self._local = threading.local()
+        self._connections = []
+        self._pid = None
+
+
+class ResultCache(object):
+    """ cache of tokenization results keyed by the input text and the split mode
+
+    The results are kept in an in-process LRU and, if a path is given, in
+    a sqlite database shared by processes and runs. The rows of the
+    database are also keyed by a fingerprint of the dictionaries, the
+    settings, the resource files and the version of SudachiPy (see
+    Dictionary.fingerprint), so a stale result is not returned after they
+    change.
+
+    The cached MorphemeList is returned as is to every caller, so it must
+    not be modified.
+
+    Attributes:
+        maxsize: the maximum number of the results in memory. 0 disables the in-process LRU.
+        hits: the number of lookups found in memory
+        disk_hits: the number of lookups found in the database
+        misses: the number of lookups not found
+        evictions: the number of results dropped from memory to keep maxsize
+
+    """
+
+    def __init__(self, maxsize: int, path: str = None, fingerprint: str = '',
+                 disk_maxsize: int = DEFAULT_RESULT_CACHE_DISK_SIZE):
+        """ Constructs a cache.
+
+        Args:
+            maxsize: the maximum number of the results in memory
+            path: the sqlite database file. None keeps the results only in memory.
+            fingerprint: the fingerprint of the dictionaries and the settings
+            disk_maxsize: the maximum number of the results in the database
+
+        """
+        if maxsize < 0 or disk_maxsize < 0:
+            raise ValueError('maxsize must not be negative')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._store = _ResultStore(path, fingerprint, disk_maxsize) if path else None
+        # guards _entries and the statistics; the database is read and written out of it
+        self._lock = threading.Lock()
+
+    def get(self, text: str, mode: str, restore: Callable[[str, str], object]):
+        """ returns the cached result or None
+
+        Args:
+            text: input text
+            mode: the name of the split mode
+            restore: builds a MorphemeList of the text from the nodes encoded by encode_path
+        Returns:
+            MorphemeList, or None if not cached
+
+        """
+        key = (mode, text)
+        with self._lock:
+            morphemes = self._entries.get(key)
+            if morphemes is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return morphemes
+            store = self._store
+        data = store.get(mode, text) if store else None
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        morphemes = restore(text, data)
+        with self._lock:
+            self._put_memory(key, morphemes)
+        return morphemes
+
+    def put(self, text: str, mode: str, morphemes) -> None:
+        with self._lock:
+            self._put_memory((mode, text), morphemes)
+            store = self._store
+        if store:
+            store.put(mode, text, encode_path(morphemes.path))
+
+    def _put_memory(self, key, morphemes) -> None:
+        if self.maxsize == 0:
+            return
+        self._entries[key] = morphemes
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """ drops all results including the ones in the database and resets the statistics """
+        with self._lock:
+            self._entries.clear()
+            store = self._store
+            self.hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+            self.evictions = 0
+        if store:
+            store.clear()
+
+    def close(self) -> None:
+        """ writes the recency of the results found in the database and closes it
+
+        It must not be called while the other threads are using the cache.
+        """
+        with self._lock:
+            store = self._store
+            self._store = None
+        if store:
+            store.close()
+
+    def cache_info(self) -> ResultCacheInfo:
+        with self._lock:
+            store = self._store
+            return ResultCacheInfo(self.hits, self.disk_hits, self.misses, self.evictions,
+                                   store.evictions if store else 0, self.maxsize, len(self._entries),
+                                   store.maxsize if store else 0, store.size() if store else 0)
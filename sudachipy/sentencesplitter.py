@@ -0,0 +1,106 @@
+# Copyright (c) 2019 Works Applications Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+import unicodedata
+from typing import Iterator, Tuple
+
+DEFAULT_MAX_LENGTH = 32768
+
+_ALPHABET_OR_NUMBER = 'a-zA-Z0-9ａ-ｚＡ-Ｚ０-９'
+_OPEN_BRACKETS = '「『（(【〔［\\[｛{〈《“‘'
+_CLOSE_BRACKETS = '」』）)】〕］\\]｝}〉》”’'
+# a period after an alphabet or a number, like "3.14" or "e.g.", does not end a sentence
+_SENTENCE_END = '(?:[。？！♪…?!]|(?<![{0}])[.．](?![{0},，、]))[.．。？！♪…?!]*'.format(_ALPHABET_OR_NUMBER)
+_SCANNER = re.compile('(?P<newline>\\n)|(?P<open>[{}])|(?P<close>[{}])|(?P<end>{})'.format(
+    _OPEN_BRACKETS, _CLOSE_BRACKETS, _SENTENCE_END))
+_TRAILER = re.compile('[{}\\s]*'.format(_CLOSE_BRACKETS))
+_CUT_POINT = re.compile('[。？！?!、，,]+|\\s+')
+_ZWJ = '\u200d'
+
+
+class SentenceSplitter(object):
+    """ splits a text into sentences
+
+    A sentence ends at a newline, or at sentence end punctuation outside
+    brackets. The closing brackets and the spaces following the
+    punctuation belong to the sentence. A sentence longer than max_length
+    is cut by find_cut.
+
+    Attributes:
+        max_length: the maximum length of a sentence in characters
+
+    """
+
+    def __init__(self, max_length: int = DEFAULT_MAX_LENGTH):
+        if max_length < 1:
+            raise ValueError('max_length must be positive')
+        self.max_length = max_length
+
+    def split(self, text: str) -> Iterator[Tuple[int, int]]:
+        """ splits a text into sentences
+
+        Args:
+            text: input text
+        Yields:
+            (begin, end) of each sentence. The sentences cover the whole text.
+
+        """
+        begin = 0
+        length = len(text)
+        while begin < length:
+            limit = min(length, begin + self.max_length)
+            end = self._find_sentence_end(text, begin, limit)
+            if end < 0:
+                end = limit if limit == length else self.find_cut(text, begin, limit)
+            yield begin, end
+            begin = end
+
+    def _find_sentence_end(self, text: str, begin: int, limit: int) -> int:
+        depth = 0
+        for m in _SCANNER.finditer(text, begin, limit):
+            kind = m.lastgroup
+            if kind == 'open':
+                depth += 1
+            elif kind == 'close':
+                depth = max(0, depth - 1)
+            elif kind == 'newline' or depth == 0:
+                return _TRAILER.match(text, m.end(), limit).end()
+        return -1
+
+    @staticmethod
+    def find_cut(text: str, begin: int, end: int) -> int:
+        """ returns a position to cut text[begin:end] before end
+
+        The position is after the last punctuation or space, or, if there
+        is none, the nearest to end but not inside a grapheme, i.e. before
+        a combining mark or next to a zero width joiner.
+
+        Args:
+            text: input text
+            begin: the beginning of the range
+            end: the end of the range, where text must continue
+        Returns:
+            the position to cut, which is greater than begin
+
+        """
+        cut = -1
+        for m in _CUT_POINT.finditer(text, begin, end):
+            cut = m.end()
+        if cut > begin:
+            return cut
+        cut = end
+        while cut > begin + 1 and (unicodedata.category(text[cut]).startswith('M') or _ZWJ in text[cut - 1:cut + 1]):
+            cut -= 1
+        return cut
@@ -0,0 +1,73 @@
+# Copyright (c) 2019 Works Applications Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Iterable, Iterator, TextIO, Union
+
+from .sentencesplitter import DEFAULT_MAX_LENGTH, SentenceSplitter
+
+
+def split_lines(input_: Union[Iterable[str], TextIO], max_length: int = DEFAULT_MAX_LENGTH) -> Iterator[str]:
+    """ splits a text stream into lines not longer than max_length
+
+    A file-like object is read with readline(max_length), so a huge line is
+    never read at once. A line longer than max_length is cut by
+    SentenceSplitter.find_cut.
+
+    Args:
+        input_: file-like object, or iterable of texts each of which
+            ends a line, like a list of sentences or an opened file
+        max_length: the maximum length of a line in characters
+    Yields:
+        lines without the line break
+
+    """
+    if max_length < 1:
+        raise ValueError('max_length must be positive')
+    if hasattr(input_, 'readline'):
+        yield from _split(_read_pieces(input_, max_length), max_length)
+        return
+    for text in input_:
+        if text:
+            yield from _split((text,), max_length)
+        else:
+            yield text
+
+
+def _read_pieces(input_: TextIO, max_length: int) -> Iterator[str]:
+    while True:
+        piece = input_.readline(max_length)
+        if not piece:
+            return
+        yield piece
+
+
+def _split(pieces: Iterable[str], max_length: int) -> Iterator[str]:
+    buffer = ''
+    for piece in pieces:
+        buffer += piece
+        begin = 0
+        while True:
+            end = buffer.find('\n', begin, begin + max_length + 1)
+            if end >= 0:
+                yield buffer[begin:end]
+                begin = end + 1
+            elif len(buffer) - begin > max_length:
+                end = SentenceSplitter.find_cut(buffer, begin, begin + max_length)
+                yield buffer[begin:end]
+                begin = end
+            else:
+                break
+        buffer = buffer[begin:]
+    if buffer:
+        yield buffer
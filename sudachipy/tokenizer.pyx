@@ -14,20 +14,26 @@
 
 import logging
 import os
+import threading
 from enum import Enum
-from typing import List
+from typing import Iterable, Iterator, List, TextIO, Union
 
 from .dictionarylib.categorytype import CategoryType
 from .dictionarylib.grammar import Grammar
 from .dictionarylib.lexicon import Lexicon
 from .lattice cimport Lattice
 from .latticenode cimport LatticeNode
-from .morphemelist import MorphemeList
+from .morphemelist import MorphemeArrays, MorphemeList, MorphemeUnits
 from .plugin.input_text import InputTextPlugin
 from .plugin.path_rewrite import PathRewritePlugin
+from .resultcache import ResultCache, decode_path
+from .sentencesplitter import DEFAULT_MAX_LENGTH, SentenceSplitter
+from .textstream import split_lines
 from .utf8inputtext import UTF8InputText
 from .utf8inputtextbuilder import UTF8InputTextBuilder
 
+cdef int NOOOVBOW = CategoryType.NOOOVBOW.value
+
 
 cdef void build_lattice_c(object tokenizer, object input_):
     bytes_ = input_.get_byte_text()
@@ -53,12 +59,10 @@ cdef void build_lattice_c(object tokenizer, object input_):
             lex = lexicon.lexicons[word_id >> 28]
             idx = (0x0FFFFFFF & word_id) * 3 # 3 is ELEMENT_SIZE_AS_SHORT
             left_id, right_id, cost = lex.word_params._array_view[idx:idx+3]
-            n = LatticeNode(lexicon, left_id, right_id, cost, word_id)
-
-            lattice.insert(i, end, n)
+            lattice.insert(i, end, lattice.new_node(lexicon, left_id, right_id, cost, word_id))
 
         # OOV
-        if CategoryType.NOOOVBOW not in input_.get_char_category_types(i):
+        if not input_.get_char_category_mask(i) & NOOOVBOW:
             for oov_plugin in tokenizer._oov_provider_plugins:
                 for node in oov_plugin.get_oov(input_, i, has_words):
                     has_words = True
@@ -88,6 +92,8 @@ class Tokenizer:
         _input_text_plugins:
 
         _lattice:
+            lattice of the current thread. Each thread gets its own
+            lattice, so a tokenizer can be shared by threads.
 
         _lexicon:
 
@@ -97,26 +103,38 @@ class Tokenizer:
 
         _path_rewrite_plugins:
 
+        _result_cache:
+            ResultCache shared by the tokenizers of a Dictionary, or None
+
     """
 
     SplitMode = Enum("SplitMode", "A B C")
 
     def __init__(self, grammar: Grammar, lexicon: Lexicon, input_text_plugins: List[InputTextPlugin],
                  oov_provider_plugins: List, path_rewrite_plugins: List[PathRewritePlugin],
-                 mode: SplitMode = None):
+                 mode: SplitMode = None, result_cache: ResultCache = None):
         self._grammar = grammar
         self._lexicon = lexicon
         self._input_text_plugins = input_text_plugins
         self._oov_provider_plugins = oov_provider_plugins
         self._path_rewrite_plugins = path_rewrite_plugins
         self._dump_output = open(os.devnull, 'w')
-        self._lattice = Lattice(grammar)
+        self._local = threading.local()
         self._mode = mode or self.SplitMode.C
+        self._result_cache = result_cache
         self._logger = logging.getLogger(__name__)
         self._logger.disabled = True
         if self._oov_provider_plugins:
             self.default_oov_provider = self._oov_provider_plugins[-1]
 
+    @property
+    def _lattice(self) -> Lattice:
+        try:
+            return self._local.lattice
+        except AttributeError:
+            lattice = self._local.lattice = Lattice(self._grammar)
+            return lattice
+
     def tokenize(self, text: str, mode=None, logger=None) -> MorphemeList:
         """ tokenize a text.
 
@@ -135,36 +153,237 @@ class Tokenizer:
 
         mode = mode or self._mode
         logger = logger or self._logger
+        return self._tokenize_cached(text, mode, logger)
 
-        builder = UTF8InputTextBuilder(text, self._grammar)
-        for plugin in self._input_text_plugins:
-            plugin.rewrite(builder)
-        input_ = builder.build()
-        logger.info('=== Inupt dump:')
-        logger.info(input_.get_text())
+    def tokenize_modes(self, text: str, modes: Iterable[SplitMode] = None) -> List[MorphemeList]:
+        """ tokenize a text in several split modes at once.
 
-        self._build_lattice(input_)
+        The lattice is built and searched only once, and the best path
+        is split for each mode.
 
-        logger.info('=== Lattice dump:')
-        self._lattice.dump(logger)
+        Args:
+            text: input text
+            modes: split modes (default: A, B and C)
+        Returns:
+            list of MorphemeList in the same order as modes
 
-        path = self._lattice.get_best_path()
+        """
+        modes = list(modes or (self.SplitMode.A, self.SplitMode.B, self.SplitMode.C))
+        if not text:
+            return [MorphemeList.empty() for _ in modes]
 
-        logger.info('=== Before Rewriting:')
-        self._dump_path(path, logger)
+        input_, path = self._find_path(text)
+        return [MorphemeList(input_, self._grammar, self._lexicon, self._split_path(path, mode)) for mode in modes]
 
-        for plugin in self._path_rewrite_plugins:
-            plugin.rewrite(input_, path, self._lattice)
-        self._lattice.clear()
+    def tokenize_multi(self, text: str) -> List[MorphemeUnits]:
+        """ tokenize a text into C units with their B and A units.
+
+        The lattice is built and searched only once. The B and A units
+        of a C unit cover the same range as the C unit, so concatenating
+        them gives the results of SplitMode.B and SplitMode.A.
+
+        Args:
+            text: input text
+        Returns:
+            list of MorphemeUnits of a C unit Morpheme and MorphemeLists
+            of its B and A units
 
+        """
+        if not text:
+            return []
+
+        input_, path = self._find_path(text)
+        grammar = self._grammar
+        lexicon = self._lexicon
+        units = []
+        for i, morpheme in enumerate(MorphemeList(input_, grammar, lexicon, path)):
+            node = path[i:i + 1]
+            units.append(MorphemeUnits(
+                morpheme,
+                MorphemeList(input_, grammar, lexicon, self._split_path(node, self.SplitMode.B)),
+                MorphemeList(input_, grammar, lexicon, self._split_path(node, self.SplitMode.A))))
+        return units
+
+    def tokenize_arrays(self, text: str, mode=None, as_numpy=False) -> MorphemeArrays:
+        """ tokenize a text into parallel arrays.
+
+        No Morpheme objects are created, which suits callers needing
+        only the offsets and the IDs.
+
+        Args:
+            text: input text
+            mode: split mode
+            as_numpy: returns NumPy arrays instead of array.array. NumPy is required.
+        Returns:
+            MorphemeArrays of begin and end offsets, word IDs, part-of-speech IDs,
+            dictionary IDs and OOV flags
+
+        """
+        return self.tokenize(text, mode).to_arrays(as_numpy)
+
+    def tokenize_nbest(self, text: str, n: int, mode=None) -> List[MorphemeList]:
+        """ tokenize a text into the n best paths.
+
+        Args:
+            text: input text
+            n: the maximum number of paths
+            mode: split mode
+        Returns:
+            list of MorphemeList in ascending order of the path cost
+
+        """
+        if n < 1:
+            raise ValueError('n must be positive')
+        if not text:
+            return [MorphemeList.empty()]
+
+        mode = mode or self._mode
+        input_ = self._build_input_text(text)
+        lattice = self._lattice
+        build_lattice_c(self, input_)
+        paths = lattice.get_nbest_paths(n)
+        for path in paths:
+            for plugin in self._path_rewrite_plugins:
+                plugin.rewrite(input_, path, lattice)
+        paths = [lattice.detach_path(path) for path in paths]
+        lattice.clear()
+
+        return [MorphemeList(input_, self._grammar, self._lexicon, self._split_path(path, mode)) for path in paths]
+
+    def tokenize_batch(self, texts: Iterable[str], mode=None) -> List[MorphemeList]:
+        """ tokenize many texts in one call.
+
+        The split mode is resolved once and the lattice is shared by
+        all texts, so per-call setup is paid only once for the batch.
+
+        Args:
+            texts: input texts
+            mode: split mode
+        Returns:
+            list of MorphemeList in the same order as texts
+
+        """
+        return list(self.tokenize_iter(texts, mode))
+
+    def tokenize_iter(self, texts: Iterable[str], mode=None) -> Iterator[MorphemeList]:
+        """ tokenize texts lazily.
+
+        A generator version of tokenize_batch.
+
+        Args:
+            texts: input texts
+            mode: split mode
+        Yields:
+            MorphemeList for each text
+
+        """
+        mode = mode or self._mode
+        tokenize = self._tokenize_cached
+        empty = MorphemeList.empty
+        for text in texts:
+            yield tokenize(text, mode) if text else empty()
+
+    def tokenize_stream(self, input_: Union[Iterable[str], TextIO], mode=None,
+                        max_length: int = DEFAULT_MAX_LENGTH, logger=None) -> Iterator[MorphemeList]:
+        """ tokenize a text stream line by line.
+
+        Memory use does not depend on the size of the stream. A line
+        longer than max_length is tokenized in pieces cut at safe
+        boundaries, and a MorphemeList is yielded for each piece.
+
+        Args:
+            input_: file-like object, or iterable of texts each of which ends a line
+            mode: split mode
+            max_length: the maximum length in characters tokenized at once
+            logger: if True output lattice structure
+        Yields:
+            MorphemeList for each line
+
+        """
+        mode = mode or self._mode
+        tokenize = self._tokenize_cached
+        empty = MorphemeList.empty
+        for line in split_lines(input_, max_length):
+            yield tokenize(line, mode, logger) if line else empty()
+
+    def tokenize_sentences(self, text: str, mode=None, max_length: int = DEFAULT_MAX_LENGTH) -> Iterator[MorphemeList]:
+        """ tokenize a text sentence by sentence.
+
+        The lattice is built for each sentence, so a long document does
+        not need a lattice over the whole text. The offsets of the
+        morphemes are relative to the whole text.
+
+        Args:
+            text: input text
+            mode: split mode
+            max_length: the maximum length of a sentence in characters.
+                A longer sentence is tokenized in pieces.
+        Yields:
+            MorphemeList for each sentence
+
+        """
+        mode = mode or self._mode
+        for begin, end in SentenceSplitter(max_length).split(text):
+            yield self._tokenize(text[begin:end], mode, offset=begin)
+
+    def _tokenize_cached(self, text: str, mode: SplitMode, logger=None) -> MorphemeList:
+        cache = self._result_cache
+        if cache is None or (logger is not None and not logger.disabled):
+            return self._tokenize(text, mode, logger)
+        morphemes = cache.get(text, mode.name, self._restore_result)
+        if morphemes is None:
+            morphemes = self._tokenize(text, mode)
+            cache.put(text, mode.name, morphemes)
+        return morphemes
+
+    def _restore_result(self, text: str, data: str) -> MorphemeList:
+        input_ = self._build_input_text(text)
+        return MorphemeList(input_, self._grammar, self._lexicon, decode_path(data, self._lexicon))
+
+    def _tokenize(self, text: str, mode: SplitMode, logger=None, offset: int = 0) -> MorphemeList:
+        dump = logger is not None and not logger.disabled
+        input_, path = self._find_path(text, logger)
         path = self._split_path(path, mode)
 
-        logger.info('=== After Rewriting:')
-        self._dump_path(path, logger)
-        logger.info('===')
+        if dump:
+            logger.info('=== After Rewriting:')
+            self._dump_path(path, logger)
+            logger.info('===')
+
+        return MorphemeList(input_, self._grammar, self._lexicon, path, offset)
+
+    def _find_path(self, text: str, logger=None):
+        dump = logger is not None and not logger.disabled
+
+        input_ = self._build_input_text(text)
+        if dump:
+            logger.info('=== Inupt dump:')
+            logger.info(input_.get_text())
+
+        lattice = self._lattice
+        build_lattice_c(self, input_)
+
+        if dump:
+            logger.info('=== Lattice dump:')
+            lattice.dump(logger)
+
+        path = lattice.get_best_path()
 
-        ml = MorphemeList(input_, self._grammar, self._lexicon, path)
-        return ml
+        if dump:
+            logger.info('=== Before Rewriting:')
+            self._dump_path(path, logger)
+
+        for plugin in self._path_rewrite_plugins:
+            plugin.rewrite(input_, path, lattice)
+        path = lattice.detach_path(path)
+        lattice.clear()
+        return input_, path
+
+    def _build_input_text(self, text: str) -> UTF8InputText:
+        builder = UTF8InputTextBuilder(text, self._grammar)
+        for plugin in self._input_text_plugins:
+            plugin.rewrite(builder)
+        return builder.build()
 
     def _build_lattice(self, input_: UTF8InputText):
         build_lattice_c(self, input_)
@@ -172,22 +391,23 @@ class Tokenizer:
     def _split_path(self, path: List[LatticeNode], mode: SplitMode) -> List[LatticeNode]:
         if mode == self.SplitMode.C:
             return path
+        a_unit = mode is self.SplitMode.A
+        lexicon = self._lexicon
         new_path = []
         for node in path:
-            if mode is self.SplitMode.A:
-                wids = node.get_word_info().a_unit_split
+            if node.get_dictionary_id() < 0:
+                split = lexicon.split_word_info(node.get_word_info(), a_unit)
             else:
-                wids = node.get_word_info().b_unit_split
-            if len(wids) <= 1:
+                split = lexicon.get_split(node.get_word_id(), a_unit)
+            if not split:
                 new_path.append(node)
-            else:
-                offset = node.get_begin()
-                for wid in wids:
-                    n = LatticeNode(self._lexicon, 0, 0, 0, wid)
-                    n.set_begin(offset)
-                    offset += n.get_word_info().head_word_length
-                    n.set_end(offset)
-                    new_path.append(n)
+                continue
+            offset = node.get_begin()
+            for wid, length in split:
+                n = LatticeNode(lexicon, 0, 0, 0, wid)
+                n.set_range(offset, offset + length)
+                offset += length
+                new_path.append(n)
         return new_path
 
     def _dump_path(self, path: List[LatticeNode], logger) -> None:
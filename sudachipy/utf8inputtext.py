@@ -12,18 +12,39 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from array import array
+
+from .dictionarylib.categorytype import CategoryType
+
 
 class UTF8InputText:
-    def __init__(self, grammar, original_text, modified_text, bytes_, offsets, byte_indexes, char_categories, char_category_continuities, can_bow_list=None):
+    def __init__(self, grammar, original_text, modified_text, bytes_, offsets, byte_indexes,
+                 char_category_masks=None, char_category_continuities=None, can_bow_list=None,
+                 char_categories=None):
         self.original_text = original_text
         self.modified_text = modified_text
         self.bytes = bytes_
         self.offsets = offsets
         self.byte_indexes = byte_indexes
-        self.char_categories = char_categories
+        # the sets of CategoryType given by the callers of the former signature
+        # are converted to the masks
+        if char_categories is not None:
+            char_category_masks = char_categories
+        if char_category_masks and not isinstance(char_category_masks[0], int):
+            char_category_masks = array('H', (CategoryType.to_mask(types) for types in char_category_masks))
+        self.char_category_masks = char_category_masks
         self.char_category_continuities = char_category_continuities
         self.can_bow_list = can_bow_list
 
+    @property
+    def char_categories(self):
+        """ the sets of CategoryType of each character, derived from char_category_masks """
+        return list(map(CategoryType.from_mask, self.char_category_masks))
+
+    @char_categories.setter
+    def char_categories(self, char_categories):
+        self.char_category_masks = array('H', (CategoryType.to_mask(types) for types in char_categories))
+
     def get_original_text(self):
         return self.original_text
 
@@ -50,15 +71,18 @@ class UTF8InputText:
         return self.offsets[index]
 
     def get_char_category_types(self, begin, end=None):
+        return CategoryType.from_mask(self.get_char_category_mask(begin, end))
+
+    def get_char_category_mask(self, begin, end=None):
         if end is None:
-            return self.char_categories[self.byte_indexes[begin]]
+            return self.char_category_masks[self.byte_indexes[begin]]
         if begin + self.get_char_category_continuous_length(begin) < end:
-            return []
+            return 0
         b = self.byte_indexes[begin]
         e = self.byte_indexes[end]
-        continuous_category = set(self.char_categories[b])
+        continuous_category = self.char_category_masks[b]
         for i in range(b + 1, e):
-            continuous_category = continuous_category & self.char_categories[i]
+            continuous_category &= self.char_category_masks[i]
         return continuous_category
 
     def get_char_category_continuous_length(self, index):
@@ -15,42 +15,106 @@
 from . import utf8inputtext
 from .dictionarylib.categorytype import CategoryType
 
+_ALPHABET_MASK = CategoryType.ALPHA.value | CategoryType.GREEK.value | CategoryType.CYRILLIC.value
+
 
 class UTF8InputTextBuilder:
+    """ builds UTF8InputText with rewriting the text
+
+    The replacements made from the beginning to the end of the text, as
+    the input text plugins do, are kept in an edit log and applied in a
+    single pass when the text or the offsets are read. Other replacements
+    apply the log first.
+    """
+
     def __init__(self, text, grammar):
 
         self.grammar = grammar
         self.original_text = text
-        self.modified_text = text
-        self.modified_to_original = list(range(len(self.original_text) + 1))
+        self._modified_text = text
+        self._modified_to_original = list(range(len(self.original_text) + 1))
+        # (begin, end, str_) in the offsets of the text before the edits
+        self._edits = []
+        # the length of the text after the edits minus the length before them
+        self._shift = 0
+        # the end of the last replacement after the edits
+        self._edit_end = 0
         # 注: サロゲートペア文字は考慮していない
 
+    @property
+    def modified_text(self):
+        self._apply_edits()
+        return self._modified_text
+
+    @property
+    def modified_to_original(self):
+        self._apply_edits()
+        return self._modified_to_original
+
     def replace(self, begin, end, str_):
+        length = len(self._modified_text) + self._shift
         if begin < 0:
             raise IndexError(begin)
-        if begin > len(self.modified_text):
+        if begin > length:
             raise IndexError("begin > length")
         if begin > end:
             raise IndexError("begin > end")
         if begin == end:
             raise AttributeError("begin == end")
 
-        if end > len(self.modified_text):
-            end = len(self.modified_text)
-
-        self.modified_text = str_.join([self.modified_text[:begin], self.modified_text[end:]])
-
-        modified_begin = self.modified_to_original[begin]
-        modified_end = self.modified_to_original[end]
-        length = len(str_)
-        if end - begin > length:
-            del self.modified_to_original[begin + length:end]
-        self.modified_to_original[begin] = modified_begin
-        for i in range(1, length):
-            if begin + i < end:
-                self.modified_to_original[begin + i] = modified_end
+        if end > length:
+            end = length
+
+        if begin < self._edit_end:
+            self._apply_edits()
+        self._edits.append((begin - self._shift, end - self._shift, str_))
+        self._shift += len(str_) - (end - begin)
+        self._edit_end = begin + len(str_)
+
+    def _apply_edits(self):
+        """ applies the edit log with the same offsets as replacing one by one
+
+        A replaced range maps its first character to the original offset of
+        its beginning and the others to that of its end. A range replaced
+        with an empty string maps the next character to the original offset
+        of its beginning.
+        """
+        if not self._edits:
+            return
+        text = self._modified_text
+        offsets = self._modified_to_original
+        texts = []
+        new_offsets = []
+        pos = 0
+        # the offset of the character at pos overwritten by the previous deletion
+        head = None
+        for begin, end, str_ in self._edits:
+            texts.append(text[pos:begin])
+            texts.append(str_)
+            begin_offset = offsets[begin]
+            if begin > pos:
+                new_offsets.append(offsets[pos] if head is None else head)
+                new_offsets.extend(offsets[pos + 1:begin])
+            elif head is not None:
+                begin_offset = head
+            if str_:
+                new_offsets.append(begin_offset)
+                new_offsets.extend([offsets[end]] * (len(str_) - 1))
+                head = None
             else:
-                self.modified_to_original.insert(begin + i, modified_end)
+                head = begin_offset
+            pos = end
+        texts.append(text[pos:])
+        if head is not None:
+            new_offsets.append(head)
+            pos += 1
+        new_offsets.extend(offsets[pos:])
+
+        self._modified_text = ''.join(texts)
+        self._modified_to_original = new_offsets
+        self._edits = []
+        self._shift = 0
+        self._edit_end = 0
 
     def get_original_text(self):
         return self.original_text
@@ -66,39 +130,33 @@ class UTF8InputTextBuilder:
         byte_indexes = [0 for i in range(length + 1)]
         offsets = [0 for i in range(length + 1)]
         j = 0
-        for i in range(len(self.modified_text)):
+        modified_to_original = self.modified_to_original
+        for i in range(len(modified_string_text)):
             # 注: サロゲートペア文字は考慮していない
-            for _ in range(self.utf8_byte_length(ord(self.modified_text[i]))):
+            for _ in range(self.utf8_byte_length(ord(modified_string_text[i]))):
                 byte_indexes[j] = i
-                offsets[j] = self.modified_to_original[i]
+                offsets[j] = modified_to_original[i]
                 j += 1
         byte_indexes[length] = len(modified_string_text)
-        offsets[length] = self.modified_to_original[-1]
+        offsets[length] = modified_to_original[-1]
 
-        char_categories = self.get_char_category_types(modified_string_text)
-        char_category_continuities = self.get_char_category_continuities(modified_string_text, length, char_categories)
-        can_bow_list = self._build_can_bow_list(modified_string_text, char_categories)
+        char_category_masks = self.get_char_category_masks(modified_string_text)
+        char_category_continuities = self._get_char_category_mask_continuities(
+            modified_string_text, char_category_masks)
+        can_bow_list = self._build_can_bow_list(modified_string_text, char_category_masks)
         return utf8inputtext.UTF8InputText(
             self.grammar, self.original_text, modified_string_text, byte_text,
-            offsets, byte_indexes, char_categories, char_category_continuities, can_bow_list)
+            offsets, byte_indexes, char_category_masks, char_category_continuities, can_bow_list)
 
     def get_char_category_types(self, text):
-        return [self.grammar.get_character_category().get_category_types(ord(c)) for c in text]
+        return list(map(CategoryType.from_mask, self.get_char_category_masks(text)))
+
+    def get_char_category_masks(self, text):
+        return self.grammar.get_character_category().get_category_masks(text)
 
     def get_char_category_continuities(self, text, byte_length, char_categories):
-        if len(text) == 0:
-            return []
-        char_category_continuities = []
-        i = 0
-        while i < len(char_categories):
-            next_ = i + self.get_char_category_continuous_length(char_categories, i)
-            length = 0
-            for j in range(i, next_):
-                length += self.utf8_byte_length(ord(text[j]))
-            for k in range(length, 0, -1):
-                char_category_continuities.append(k)
-            i = next_
-        return char_category_continuities
+        char_category_masks = [CategoryType.to_mask(types) for types in char_categories]
+        return self._get_char_category_mask_continuities(text, char_category_masks)
 
     def get_char_category_continuous_length(self, char_categories, offset):
         continuous_category = set(char_categories[offset])
@@ -108,6 +166,26 @@ class UTF8InputTextBuilder:
                 return length
         return len(char_categories) - offset
 
+    def _get_char_category_mask_continuities(self, text, char_category_masks):
+        if len(text) == 0:
+            return []
+        char_category_continuities = []
+        i = 0
+        while i < len(char_category_masks):
+            next_ = i + self._get_char_category_mask_continuous_length(char_category_masks, i)
+            length = len(text[i:next_].encode('utf-8'))
+            char_category_continuities.extend(range(length, 0, -1))
+            i = next_
+        return char_category_continuities
+
+    def _get_char_category_mask_continuous_length(self, char_category_masks, offset):
+        continuous_category = char_category_masks[offset]
+        for length in range(1, len(char_category_masks) - offset):
+            continuous_category &= char_category_masks[offset + length]
+            if not continuous_category:
+                return length
+        return len(char_category_masks) - offset
+
     def utf8_byte_length(self, cp):
         if cp < 0:
             return 0
@@ -122,20 +200,12 @@ class UTF8InputTextBuilder:
         else:
             return 0
 
-    def _build_can_bow_list(self, text, char_categories):
+    def _build_can_bow_list(self, text, char_category_masks):
         if not text:
             return []
-        can_bow_list = []
-        for i, cat in enumerate(char_categories):
-            if i == 0:
-                can_bow_list.append(True)
-                continue
-
-            if CategoryType.ALPHA in cat or CategoryType.GREEK in cat or CategoryType.CYRILLIC in cat:
-                types = cat & char_categories[i - 1]
-                can_bow_list.append(not bool(types))
-                continue
-
-            can_bow_list.append(True)
-
+        can_bow_list = [True] * len(char_category_masks)
+        for i in range(1, len(char_category_masks)):
+            mask = char_category_masks[i]
+            if mask & _ALPHABET_MASK and mask & char_category_masks[i - 1]:
+                can_bow_list[i] = False
         return can_bow_list
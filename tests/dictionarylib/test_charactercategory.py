@@ -47,6 +47,21 @@ class TestCharacterCategory(unittest.TestCase):
         self.assertEqual({CategoryType.KANJI}, cat.get_category_types(ord('熙')))
         self.assertNotEqual({CategoryType.DEFAULT}, cat.get_category_types(ord('熙')))
 
+    def test_get_category_mask(self):
+        cat = charactercategory.CharacterCategory()
+        cat.read_character_definition(os.path.join(self.test_resources_dir, 'char.def'))
+        for cp in list(range(0, 0x3100)) + [0x4E00, 0x9FFF, 0xFF10, 0xFFFF, 0x10000, 0x20B9F, 0x10FFFF]:
+            self.assertEqual(cat.get_category_types(cp), CategoryType.from_mask(cat.get_category_mask(cp)))
+        self.assertEqual(CategoryType.KANJI.value, cat.get_category_mask(ord('熙')))
+
+    def test_get_category_masks(self):
+        cat = charactercategory.CharacterCategory()
+        cat.read_character_definition(os.path.join(self.test_resources_dir, 'char.def'))
+        text = 'Aあ1熙\U00020B9F'
+        self.assertEqual([cat.get_category_mask(ord(c)) for c in text], list(cat.get_category_masks(text)))
+        self.assertEqual([cat.get_category_mask(ord(c)) for c in text[:-1]], list(cat.get_category_masks(text[:-1])))
+        self.assertEqual(0, len(cat.get_category_masks('')))
+
     def test_read_character_definition(self):
         f = os.path.join(self.test_dir, 'test_file.txt')
         with open(f, 'w') as wf:
@@ -107,6 +122,8 @@ class TestCharacterCategory(unittest.TestCase):
         self.assertEqual({CategoryType.KANJI}, cat.get_category_types(0x4E8B))
         self.assertEqual({CategoryType.KANJI, CategoryType.KANJINUMERIC}, cat.get_category_types(0x4E8C))
         self.assertEqual({CategoryType.KANJI}, cat.get_category_types(0x4E8D))
+        self.assertEqual(CategoryType.KANJI.value | CategoryType.KANJINUMERIC.value, cat.get_category_mask(0x4E8C))
+        self.assertEqual(CategoryType.DEFAULT.value, cat.get_category_mask(0x4E8C + 0x10000))
 
     def test_read_character_definition_with_invalid_format(self):
         f = os.path.join(self.test_dir, 'test_file.txt')
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import csv
 import os
 import shutil
 import tempfile
@@ -21,6 +22,7 @@ from logging import getLogger
 from unittest import TestCase, mock
 
 from sudachipy.dictionarylib import SYSTEM_DICT_VERSION_2
+from sudachipy.dictionarylib import dictionarybuilder
 from sudachipy.dictionarylib.dictionarybuilder import DictionaryBuilder
 from sudachipy.dictionarylib.dictionaryheader import DictionaryHeader
 from sudachipy.dictionarylib.lexicon import Lexicon
@@ -106,6 +108,84 @@ class TestDictionaryBuilder(TestCase):
         self.assertTrue(0 in builder.trie_keys['abc'.encode('utf-8')])
         self.assertTrue(1 in builder.trie_keys['abc'.encode('utf-8')])
 
+    def test_get_wordid(self):
+        builder = DictionaryBuilder(logger=self.logger)
+        with open(self.input_path, 'r', encoding='utf-8') as rf:
+            builder.build_lexicon(rf)
+        self.assertEqual(3, len(builder.pos_table.get_list()))
+        self.assertEqual(1, builder.word_to_id('東,名詞,普通名詞,一般,*,*,*,ヒガシ'))
+        self.assertEqual(3, builder.word_to_id('1,名詞,数詞,*,*,*,*,イチ'))
+        self.assertEqual(-1, builder.word_to_id('東,名詞,普通名詞,一般,*,*,*,アズマ'))
+        self.assertEqual(2, builder.get_wordid('京都', 0, 'キョウト'))
+        self.assertEqual(-1, builder.get_wordid('京都', 1, 'キョウト'))
+
+    def test_build_lexicon_in_parallel(self):
+        builder = DictionaryBuilder(logger=self.logger)
+        with open(self.input_path, 'r', encoding='utf-8') as rf:
+            builder.build_lexicon(rf)
+        parallel_builder = DictionaryBuilder(logger=self.logger, processes=2)
+        with mock.patch.object(dictionarybuilder, '_CHUNK_LINES', 2), \
+                open(self.input_path, 'r', encoding='utf-8') as rf:
+            parallel_builder.build_lexicon(rf)
+        self.assertEqual(builder.pos_table.get_list(), parallel_builder.pos_table.get_list())
+        self.assertEqual(dict(builder.trie_keys), dict(parallel_builder.trie_keys))
+        self.assertEqual(builder.word_ids, parallel_builder.word_ids)
+        self.assertEqual([vars(e.wordinfo) for e in builder.entries],
+                         [vars(e.wordinfo) for e in parallel_builder.entries])
+        self.assertEqual([e.cunit_split_string for e in builder.entries],
+                         [e.cunit_split_string for e in parallel_builder.entries])
+
+    def test_build_lexicon_in_parallel_with_invalid_line(self):
+        with open(self.input_path, 'a', encoding='utf-8') as wf:
+            wf.write('\n京都,0,0,0,京都\n')
+        builder = DictionaryBuilder(logger=self.logger, processes=2)
+        with mock.patch.object(dictionarybuilder, '_CHUNK_LINES', 2), \
+                open(self.input_path, 'r', encoding='utf-8') as rf:
+            with self.assertRaises(ValueError) as cm:
+                builder.build_lexicon(rf)
+        self.assertEqual('invalid format', cm.exception.args[0])
+        self.assertEqual(5, len(builder.entries))
+
+    def test_read_line_chunks(self):
+        lines = ['a,"b\n', 'c",d\n', 'e,f\n', 'g,h\n']
+        self.assertEqual([lines[:2], lines[2:3], lines[3:]], list(dictionarybuilder._read_line_chunks(lines, 1)))
+
+    def test_read_line_chunks_with_literal_quotes(self):
+        # a quote in an unquoted field is a literal, and '""' is an escaped quote
+        lines = ['a"b,"c\n', 'd",e\n', 'f,"g""\n', 'h"\n', 'i,j"k"\n', 'l,m\n']
+        chunks = list(dictionarybuilder._read_line_chunks(lines, 1))
+        self.assertEqual([lines[:2], lines[2:4], lines[4:5], lines[5:]], chunks)
+        self.assertEqual(list(csv.reader(lines)), [row for chunk in chunks for row in csv.reader(chunk)])
+
+    def build_to_bytes(self, builder):
+        out_path = os.path.join(self.test_dir, 'output.dic')
+        with open(out_path, 'wb') as out_stream, open(self.matrix_path, 'r', encoding='utf-8') as matrix_input_stream:
+            builder.build([self.input_path], matrix_input_stream, out_stream)
+        with open(out_path, 'rb') as rf:
+            return rf.read()
+
+    def test_build_streaming(self):
+        expected = self.build_to_bytes(DictionaryBuilder(logger=self.logger))
+        builder = DictionaryBuilder(logger=self.logger, streaming=True, temp_dir=self.test_dir)
+        # sorts the trie keys in several runs
+        builder.spill.run_size = 2
+        self.assertEqual(expected, self.build_to_bytes(builder))
+        self.assertIsNone(builder.spill)
+        self.assertEqual([], builder.entries)
+        self.assertEqual(['input.txt', 'matrix.txt', 'output.dic'], sorted(os.listdir(self.test_dir)))
+
+    def test_get_wordid_streaming(self):
+        builder = DictionaryBuilder(logger=self.logger, streaming=True)
+        with open(self.input_path, 'r', encoding='utf-8') as rf:
+            builder.build_lexicon(rf)
+        self.assertEqual(5, builder.word_size())
+        self.assertEqual(1, builder.word_to_id('東,名詞,普通名詞,一般,*,*,*,ヒガシ'))
+        self.assertEqual(-1, builder.get_wordid('京都', 1, 'キョウト'))
+        builder.check_wordid(4)
+        with self.assertRaises(ValueError):
+            builder.check_wordid(5)
+        builder.close()
+
     def test_convert_postable(self):
         builder = DictionaryBuilder(logger=self.logger)
         builder.convert_postable(['a,b,c,d,e,f', 'g,h,i,j,k,l'])
@@ -120,6 +200,38 @@ class TestDictionaryBuilder(TestCase):
         self.assertEqual(0, int.from_bytes(matrix.getvalue()[0:2], byteorder='little'))
         self.assertEqual(4, int.from_bytes(matrix.getvalue()[(2 + 1) * 2:(2 + 1) * 2 + 2], byteorder='little'))
 
+    def test_convert_matrix_not_in_order(self):
+        in_stream = StringIO('2 3\n# comment\n1 2 5\n0 0 -1\n0 1 1\n0 2 2\n1 0 3\n1 1 4\n')
+        builder = DictionaryBuilder(logger=self.logger)
+        matrix = builder.convert_matrix(in_stream).getvalue()
+        self.assertEqual(2 * 2 * 3, len(matrix))
+        costs = [int.from_bytes(matrix[i:i + 2], byteorder='little', signed=True) for i in range(0, len(matrix), 2)]
+        self.assertEqual([-1, 3, 1, 4, 2, 5], costs)
+
+        # the last cell is not given
+        in_stream = StringIO('2 3\n0 0 0\n0 1 1\n0 2 2\n1 0 3\n1 1 4')
+        matrix = builder.convert_matrix(in_stream).getvalue()
+        self.assertEqual(2 * 2 * 3, len(matrix))
+        self.assertEqual(0, int.from_bytes(matrix[10:12], byteorder='little'))
+
+    def test_convert_matrix_after_comment(self):
+        in_stream = StringIO('2 3\n# comment\n0 0 0\n0 1 1\n0 2 2\n\n1 0 3\n1 1 4\n1 2 5\n')
+        builder = DictionaryBuilder(logger=self.logger)
+        with mock.patch.object(DictionaryBuilder, '_DictionaryBuilder__convert_matrix_line',
+                               wraps=builder._DictionaryBuilder__convert_matrix_line) as convert_matrix_line:
+            matrix = builder.convert_matrix(in_stream).getvalue()
+        # only the comment and the blank line are converted line by line
+        self.assertEqual(2, convert_matrix_line.call_count)
+        costs = [int.from_bytes(matrix[i:i + 2], byteorder='little', signed=True) for i in range(0, len(matrix), 2)]
+        self.assertEqual([0, 3, 1, 4, 2, 5], costs)
+
+    def test_convert_matrix_invalid_id(self):
+        builder = DictionaryBuilder(logger=self.logger)
+        for text in ['2 2\n0 -1 7\n', '2 2\n0 0 1\n2 0 7\n', '2 2\n0 0 1\n0 2 7\n']:
+            with self.assertRaises(ValueError) as cm:
+                builder.convert_matrix(StringIO(text))
+            self.assertRegex(cm.exception.args[0], r'^invalid format at line \d+$')
+
     def test_decode(self):
         builder = DictionaryBuilder(logger=self.logger)
         self.assertEqual('a,c', builder.decode('a\\u002cc'))
@@ -14,10 +14,13 @@
 
 import mmap
 import os
+import shutil
+import tempfile
 import unittest
 
 from sudachipy.dictionarylib.dictionaryheader import DictionaryHeader
 from sudachipy.dictionarylib.doublearraylexicon import DoubleArrayLexicon
+from sudachipy.dictionarylib.wordidindex import WordIdIndex, compute_stamp
 
 
 class TestDoubleArrayLexicon(unittest.TestCase):
@@ -59,6 +62,19 @@ class TestDoubleArrayLexicon(unittest.TestCase):
         with self.assertRaises(StopIteration):
             res.__next__()
 
+    def test_lookup_in_long_text(self):
+        text = ('あ' * 200 + '東京都' + 'あ' * 200).encode('utf-8')
+        res = list(self.lexicon.lookup(text, 600))
+        self.assertEqual([(4, 603), (5, 606), (6, 609)], res)
+
+    def test_lookup_longer_than_window(self):
+        # 0123456789 * 30 is longer than the lookup window
+        text = ('0123456789' * 40).encode('utf-8')
+        res = list(self.lexicon.lookup(text, 0))
+        self.assertIn((36, 300), res)
+        res = list(self.lexicon.lookup(text, 1))
+        self.assertNotIn(36, [wid for wid, _ in res])
+
     def test_parameters(self):
         # た
         self.assertEqual(1, self.lexicon.get_left_id(0))
@@ -114,9 +130,49 @@ class TestDoubleArrayLexicon(unittest.TestCase):
         self.assertEqual(300, len(wi.dictionary_form))
         self.assertEqual(570, len(wi.reading_form))
 
+    def test_wordinfo_decoded_lazily(self):
+        # 行っ
+        wi = self.lexicon.get_word_info(8)
+        self.assertEqual('行っ', wi.surface)
+        self.assertNotIn('reading_form', vars(wi))
+        self.assertNotIn('dictionary_form', vars(wi))
+        self.assertEqual('行く', wi.dictionary_form)
+        wi.pos_id = 100
+        self.assertEqual(100, wi.pos_id)
+        self.assertEqual(6, self.lexicon.get_word_info(8).pos_id)
+
     def test_size(self):
         self.assertEqual(39, self.lexicon.size())
 
+    def test_get_word_id(self):
+        self.assertEqual(6, self.lexicon.get_word_id('東京都', 3, 'トウキョウト'))
+        self.assertIsNone(self.lexicon.word_id_index)
+        # アイウ(12) is not in the trie by its surface
+        self.assertEqual(12, self.lexicon.get_word_id('アイウ', 3, 'アイアイウ'))
+        self.assertIsNotNone(self.lexicon.word_id_index)
+        self.assertEqual(-1, self.lexicon.get_word_id('東京都', 4, 'トウキョウト'))
+        self.assertEqual(-1, self.lexicon.get_word_id('ぴらる', 4, 'ピラル'))
+
+    def test_word_id_index_file(self):
+        test_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(test_dir, 'system.dic.widx')
+            self.lexicon.word_id_index_file = path
+            self.assertEqual(12, self.lexicon.get_word_id('アイウ', 3, 'アイアイウ'))
+            self.assertTrue(os.path.exists(path))
+
+            word_infos = self.lexicon.word_infos
+            stamp = compute_stamp(word_infos)
+            index = WordIdIndex.load(path, word_infos.size(), stamp)
+            self.assertEqual(list(self.lexicon.word_id_index.hashes), list(index.hashes))
+            self.assertEqual(list(self.lexicon.word_id_index.word_ids), list(index.word_ids))
+            self.assertEqual([12], list(index.find('アイウ', 3, 'アイアイウ')))
+            self.assertIsNone(WordIdIndex.load(path, word_infos.size(), stamp + 1))
+            self.assertIsNone(WordIdIndex.load(path, word_infos.size() + 1, stamp))
+            self.assertIsNone(WordIdIndex.load(os.path.join(test_dir, 'none.widx'), word_infos.size(), stamp))
+        finally:
+            shutil.rmtree(test_dir)
+
 
 if __name__ == '__main__':
     unittest.main()
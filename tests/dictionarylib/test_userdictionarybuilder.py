@@ -104,3 +104,20 @@ class TestUserDictionaryBuilder(TestCase):
         lst = lexicon.lookup('東'.encode('utf-8'), 0)
         with self.assertRaises(StopIteration):
             lst.__next__()
+
+    def test_build_streaming(self):
+        in_path = os.path.join(self.test_dir, 'input.txt')
+        with open(in_path, 'w', encoding='utf-8') as wf:
+            wf.write("東京都市,0,0,0,東京都市,名詞,固有名詞,地名,一般,*,*,ヒガシキョウトシ,東京都市,*,B,"
+                     "\"東,名詞,普通名詞,一般,*,*,*,ヒガシ/3/U1\",*,\"4/3/市,名詞,普通名詞,一般,*,*,*,シ\",*\n")
+            wf.write('市,-1,-1,0,市,名詞,普通名詞,一般,*,*,*,シ,市,*,A,*,*,*,*\n')
+
+        outputs = []
+        for streaming in (False, True):
+            out_path = os.path.join(self.test_dir, 'output{}.dic'.format(len(outputs)))
+            with open(out_path, 'wb') as out_stream:
+                builder = UserDictionaryBuilder(self.grammar, self.lexicon_set, logger=self.logger, streaming=streaming)
+                builder.build([in_path], None, out_stream)
+            with open(out_path, 'rb') as rf:
+                outputs.append(rf.read())
+        self.assertEqual(outputs[0], outputs[1])
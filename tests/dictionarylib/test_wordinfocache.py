@@ -0,0 +1,76 @@
+# Copyright (c) 2019 Works Applications Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from sudachipy.dictionarylib.wordinfocache import WordInfoCache
+
+
+class TestWordInfoCache(unittest.TestCase):
+
+    def test_get(self):
+        cache = WordInfoCache(2)
+        self.assertIsNone(cache.get(1))
+        cache.put(1, 'a')
+        self.assertEqual('a', cache.get(1))
+        info = cache.cache_info()
+        self.assertEqual(1, info.hits)
+        self.assertEqual(1, info.misses)
+        self.assertEqual(1, info.currsize)
+
+    def test_eviction(self):
+        cache = WordInfoCache(2)
+        cache.put(1, 'a')
+        cache.put(2, 'b')
+        cache.get(1)
+        cache.put(3, 'c')
+        self.assertEqual('a', cache.get(1))
+        self.assertIsNone(cache.get(2))
+        self.assertEqual('c', cache.get(3))
+        self.assertEqual(1, cache.cache_info().evictions)
+        self.assertEqual(2, cache.cache_info().currsize)
+
+    def test_pin(self):
+        cache = WordInfoCache(1)
+        cache.put(1, 'a')
+        cache.pin(1, 'a')
+        cache.put(2, 'b')
+        cache.put(3, 'c')
+        self.assertEqual('a', cache.get(1))
+        self.assertEqual(1, cache.cache_info().pinned)
+        self.assertEqual(1, cache.cache_info().currsize)
+
+    def test_disabled(self):
+        cache = WordInfoCache(0)
+        cache.put(1, 'a')
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(0, cache.cache_info().currsize)
+
+    def test_clear(self):
+        cache = WordInfoCache(2)
+        cache.put(1, 'a')
+        cache.pin(2, 'b')
+        cache.get(1)
+        cache.clear()
+        self.assertIsNone(cache.get(1))
+        self.assertIsNone(cache.get(2))
+        self.assertEqual((0, 2, 0, 2, 0, 0), tuple(cache.cache_info()))
+
+    def test_negative_size(self):
+        with self.assertRaises(ValueError):
+            WordInfoCache(-1)
+
+
+if __name__ == '__main__':
+    unittest.main()
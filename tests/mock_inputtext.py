@@ -15,6 +15,7 @@
 from copy import deepcopy
 from unittest import mock
 
+from sudachipy.dictionarylib.categorytype import CategoryType
 from sudachipy.utf8inputtext import UTF8InputText
 
 
@@ -61,6 +62,13 @@ def _mocked_get_char_category_types(begin: int, end: int = None) -> set:
 mocked_input_text.get_char_category_types.side_effect = _mocked_get_char_category_types
 
 
+def _mocked_get_char_category_mask(begin: int, end: int = None) -> int:
+    return CategoryType.to_mask(_mocked_get_char_category_types(begin, end))
+
+
+mocked_input_text.get_char_category_mask.side_effect = _mocked_get_char_category_mask
+
+
 def _mocked_get_char_category_continuous_length(idx: int) -> int:
     global text, types
     continuous_category = deepcopy(types[idx])
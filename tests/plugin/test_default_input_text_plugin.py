@@ -81,6 +81,31 @@ class TestDefaultInputTextPlugin(unittest.TestCase):
         self.assertEqual(7, text.get_original_index(15))
         self.assertEqual(7, text.get_original_index(17))
 
+    def test_rewrite_replaced_strings_and_outside_bmp(self):
+        builder = UTF8InputTextBuilder('ｶﾞは゛はﾟ\U0001D400ａ漢', mock_grammar.mocked_grammar)
+        self.plugin.rewrite(builder)
+        self.assertEqual('ガばぱAa漢', builder.get_text())
+        self.assertEqual([0, 2, 4, 6, 7, 8, 9], builder.modified_to_original)
+
+        builder = UTF8InputTextBuilder('はは', mock_grammar.mocked_grammar)
+        self.plugin.rewrite(builder)
+        self.assertEqual('はは', builder.get_text())
+
+    def test_rewrite_normalized_text(self):
+        builder = UTF8InputTextBuilder('ばはﾞ\u3099abc', mock_grammar.mocked_grammar)
+        self.plugin.rewrite(builder)
+        self.assertEqual('ばば\u3099abc', builder.get_text())
+        for text, expected in (('東京都へ行く', '東京都へ行く'), ('ーは\u3099', 'ーば'), ('ⅲ', 'ⅲ')):
+            builder = UTF8InputTextBuilder(text, mock_grammar.mocked_grammar)
+            self.plugin.rewrite(builder)
+            self.assertEqual(expected, builder.get_text())
+
+    def test_normalize_cache_info(self):
+        for _ in range(2):
+            self.plugin.rewrite(UTF8InputTextBuilder('\U0001D400\U0001D401', mock_grammar.mocked_grammar))
+        info = self.plugin.normalize_cache_info()
+        self.assertEqual((2, 2, 2), (info.hits, info.misses, info.currsize))
+
     # def test_setup_with_null(self):
 
     def test_invalid_format_ignorelist(self):
@@ -12,7 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import os
+import shutil
+import tempfile
 import unittest
 
 from sudachipy import tokenizer
@@ -39,6 +42,47 @@ class TestDictionary(unittest.TestCase):
         self.assertIsNotNone(pos)
         self.assertEqual('助動詞', pos[0])
 
+    def test_word_info_cache(self):
+        lexicon = self.dict_.lexicon
+        lexicon.word_info_cache.clear()
+        wi = lexicon.get_word_info(3)
+        self.assertIs(wi, lexicon.get_word_info(3))
+        info = lexicon.word_info_cache.cache_info()
+        self.assertEqual(1, info.hits)
+        self.assertEqual(1, info.misses)
+
+    def test_word_info_after_close(self):
+        resource_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources')
+        dict_ = Dictionary(os.path.join(resource_dir, 'sudachi.json'), resource_dir=resource_dir)
+        read = dict_.lexicon.get_word_info(5)
+        self.assertEqual('トウキョウ', read.reading_form)
+        unread = dict_.lexicon.get_word_info(6)
+        dict_.close()
+        self.assertEqual('トウキョウ', read.reading_form)
+        self.assertEqual('東京都', unread.surface)
+        with self.assertRaisesRegex(ValueError, 'closed'):
+            unread.reading_form
+
+    def test_word_info_cache_settings(self):
+        resource_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources')
+        with open(os.path.join(resource_dir, 'sudachi.json'), 'r', encoding='utf-8') as f:
+            settings = json.load(f)
+        settings['wordInfoCacheSize'] = 10
+        settings['wordInfoCachePinnedWords'] = [3, 7]
+        test_dir = tempfile.mkdtemp()
+        try:
+            config_path = os.path.join(test_dir, 'sudachi.json')
+            with open(config_path, 'w', encoding='utf-8') as f:
+                json.dump(settings, f)
+            dict_ = Dictionary(config_path, resource_dir=resource_dir)
+            info = dict_.lexicon.word_info_cache.cache_info()
+            self.assertEqual(10, info.maxsize)
+            self.assertEqual(2, info.pinned)
+            self.assertEqual('行く', dict_.lexicon.get_word_info(7).surface)
+            dict_.close()
+        finally:
+            shutil.rmtree(test_dir)
+
     # def test_creat_with_merging_settings
 
     # def test_creat_with_merging_null_ settings
@@ -57,6 +57,16 @@ class TestGrammar(unittest.TestCase):
         self.assertEqual("五段-サ行", self.grammar.get_part_of_speech_string(2)[4])
         self.assertEqual("終止形-一般", self.grammar.get_part_of_speech_string(2)[5])
 
+    def test_get_part_of_speech_id(self):
+        self.assertEqual(0, self.grammar.get_part_of_speech_id(['BOS/EOS', '*', '*', '*', '*', '*']))
+        self.assertEqual(2, self.grammar.get_part_of_speech_id(['動詞', '一般', '*', '*', '五段-サ行', '終止形-一般']))
+        self.assertEqual(-1, self.grammar.get_part_of_speech_id(['動詞', '一般', '*', '*', '*', '*']))
+
+    def test_add_pos_list(self):
+        self.grammar.add_pos_list(self.grammar)
+        self.assertEqual(6, self.grammar.get_part_of_speech_size())
+        self.assertEqual(1, self.grammar.get_part_of_speech_id(['名刺', '一般', '*', '*', '*', '*']))
+
     def test_get_connect_cost(self):
         self.assertEqual(0, self.grammar.get_connect_cost(0, 0))
         self.assertEqual(-100, self.grammar.get_connect_cost(2, 1))
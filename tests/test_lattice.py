@@ -0,0 +1,89 @@
+# Copyright (c) 2019 Works Applications Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from unittest import mock
+
+from sudachipy.dictionarylib.grammar import Grammar
+from sudachipy.lattice import Lattice
+from sudachipy.latticenode import LatticeNode
+
+
+class TestLattice(unittest.TestCase):
+
+    def setUp(self):
+        # connection costs are indexed by [left-ID of right node, right-ID of left node]
+        matrix = memoryview(bytearray(2 * 3 * 3)).cast('h', shape=[3, 3])
+        matrix[1, 1] = 100
+        grammar = mock.Mock(spec=Grammar)
+        grammar.get_bos_parameter.return_value = [0, 0, 0]
+        grammar.get_eos_parameter.return_value = [0, 0, 0]
+        grammar._matrix_view = matrix
+        self.lattice = Lattice(grammar)
+        self.lattice.resize(3)
+
+    def insert(self, begin, end, left_id, right_id, cost):
+        node = LatticeNode(None, left_id, right_id, cost, 0)
+        self.lattice.insert(begin, end, node)
+        return node
+
+    def test_insert_left_node_after_connect(self):
+        a = self.insert(0, 1, 0, 1, 10)
+        b = self.insert(1, 2, 1, 0, 0)
+        self.assertIs(a, b.best_previous_node)
+        self.assertEqual(110, b.total_cost)
+
+        c = self.insert(0, 1, 0, 2, 20)
+        d = self.insert(1, 3, 1, 0, 0)
+        self.assertIs(c, d.best_previous_node)
+        self.assertEqual(20, d.total_cost)
+
+    def test_remove_left_node_after_connect(self):
+        a = self.insert(0, 1, 0, 1, 10)
+        c = self.insert(0, 1, 0, 2, 20)
+        b = self.insert(1, 2, 1, 0, 0)
+        self.assertIs(c, b.best_previous_node)
+        self.assertEqual(20, b.total_cost)
+
+        self.lattice.remove(0, 1, c)
+        d = self.insert(1, 3, 1, 0, 0)
+        self.assertIs(a, d.best_previous_node)
+        self.assertEqual(110, d.total_cost)
+
+    def test_change_left_nodes_without_insert(self):
+        a = self.insert(0, 1, 0, 1, 10)
+        c = self.insert(0, 2, 0, 2, 20)
+        b = self.insert(1, 2, 1, 0, 0)
+        self.assertIs(a, b.best_previous_node)
+
+        self.lattice.get_nodes_with_end(2).remove(c)
+        self.lattice.get_nodes_with_end(1).append(c)
+        d = self.insert(1, 3, 1, 0, 0)
+        self.assertIs(c, d.best_previous_node)
+        self.assertEqual(20, d.total_cost)
+
+    def test_right_id_out_of_matrix(self):
+        self.insert(0, 1, 0, 3, 0)
+        with self.assertRaises(IndexError):
+            self.insert(1, 2, 0, 0, 0)
+
+        self.lattice.clear()
+        self.lattice.resize(3)
+        self.insert(0, 1, 0, -1, 0)
+        with self.assertRaises(IndexError):
+            self.insert(1, 2, 0, 0, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+# Copyright (c) 2019 Works Applications Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import multiprocessing
+import os
+import unittest
+
+from sudachipy import dictionary
+from sudachipy.parallel import TokenizerPool, to_records
+
+
+def surfaces(ms):
+    return [m.surface() for m in ms]
+
+
+@unittest.skipUnless('fork' in multiprocessing.get_all_start_methods(), 'fork is not available')
+class TestTokenizerPool(unittest.TestCase):
+
+    def setUp(self):
+        resource_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources')
+        self.dict_ = dictionary.Dictionary(os.path.join(resource_dir, 'sudachi.json'), resource_dir)
+        self.tokenizer_obj = self.dict_.create()
+        self.texts = ['京都', '東京都', '', 'ぴらる', '東京府', '特ab'] * 5
+
+    def test_tokenize_batch(self):
+        with TokenizerPool(self.dict_, processes=2, chunksize=4) as pool:
+            results = pool.tokenize_batch(self.texts)
+        expected = [to_records(self.tokenizer_obj.tokenize(text)) for text in self.texts]
+        self.assertEqual(expected, results)
+
+    def test_tokenize_iter_unordered(self):
+        with TokenizerPool(self.dict_, processes=2, chunksize=3, max_pending=2, formatter=surfaces) as pool:
+            results = dict(pool.tokenize_iter_unordered(iter(self.texts)))
+        self.assertEqual(list(range(len(self.texts))), sorted(results))
+        for i, text in enumerate(self.texts):
+            self.assertEqual(surfaces(self.tokenizer_obj.tokenize(text)), results[i])
+
+    def test_records(self):
+        with TokenizerPool(self.dict_, processes=1) as pool:
+            records = pool.tokenize_batch(['京都'])[0]
+        self.assertEqual(1, len(records))
+        self.assertEqual('京都', records[0].surface)
+        self.assertEqual(('名詞', '固有名詞', '地名', '一般', '*', '*'), records[0].part_of_speech)
+        self.assertEqual(0, records[0].dictionary_id)
+        self.assertFalse(records[0].is_oov)
+
+
+if __name__ == '__main__':
+    unittest.main()
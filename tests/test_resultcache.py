@@ -0,0 +1,211 @@
+# Copyright (c) 2019 Works Applications Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from sudachipy import resultcache
+from sudachipy.dictionary import Dictionary
+from sudachipy.resultcache import ResultCache
+from sudachipy.tokenizer import Tokenizer
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        resource_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources')
+        self.dict_ = Dictionary(os.path.join(resource_dir, 'sudachi.json'), resource_dir)
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def create_tokenizer(self, cache):
+        self.dict_.result_cache = cache
+        return self.dict_.create()
+
+    @staticmethod
+    def to_tuples(ms):
+        return [(m.surface(), m.begin(), m.end(), m.word_id(), m.part_of_speech(), m.normalized_form(),
+                 m.dictionary_form(), m.reading_form(), m.dictionary_id(), m.is_oov()) for m in ms]
+
+    def test_memory(self):
+        cache = ResultCache(2)
+        tokenizer_obj = self.create_tokenizer(cache)
+        ms = tokenizer_obj.tokenize('東京都')
+        self.assertIs(ms, tokenizer_obj.tokenize('東京都'))
+        self.assertIsNot(ms, tokenizer_obj.tokenize('東京都', Tokenizer.SplitMode.A))
+        tokenizer_obj.tokenize('京都')
+        info = cache.cache_info()
+        self.assertEqual((1, 0, 3, 1, 2, 2), (info.hits, info.disk_hits, info.misses, info.evictions,
+                                              info.maxsize, info.currsize))
+        self.assertEqual(2, len(list(tokenizer_obj.tokenize_iter(['京都', '東京都']))))
+        self.assertEqual(2, cache.cache_info().hits)
+
+        cache.clear()
+        self.assertEqual((0, 0, 0), cache.cache_info()[:3])
+
+    def test_disk(self):
+        path = os.path.join(self.test_dir, 'results.db')
+        texts = ['東京都に行った', '1,234ぴらるザーチ', '東京都']
+        tokenizer_obj = Tokenizer(self.dict_.grammar, self.dict_.lexicon, self.dict_.input_text_plugins,
+                                  self.dict_.oov_provider_plugins, self.dict_.path_rewrite_plugins)
+        expected = [self.to_tuples(tokenizer_obj.tokenize(text, Tokenizer.SplitMode.A)) for text in texts]
+
+        cache = ResultCache(0, path, self.dict_.fingerprint())
+        tokenizer_obj = self.create_tokenizer(cache)
+        for text in texts:
+            tokenizer_obj.tokenize(text, Tokenizer.SplitMode.A)
+        cache.close()
+
+        cache = ResultCache(10, path, self.dict_.fingerprint())
+        tokenizer_obj = self.create_tokenizer(cache)
+        results = [tokenizer_obj.tokenize(text, Tokenizer.SplitMode.A) for text in texts]
+        self.assertEqual(expected, [self.to_tuples(ms) for ms in results])
+        info = cache.cache_info()
+        self.assertEqual((0, 3, 0), info[:3])
+        self.assertEqual(3, info.disk_currsize)
+        cache.close()
+
+        cache = ResultCache(10, path, 'another dictionary')
+        self.create_tokenizer(cache).tokenize(texts[0])
+        info = cache.cache_info()
+        self.assertEqual((0, 0, 1), info[:3])
+        cache.close()
+
+    def test_disk_eviction(self):
+        cache = ResultCache(0, os.path.join(self.test_dir, 'results.db'), disk_maxsize=10)
+        tokenizer_obj = self.create_tokenizer(cache)
+        for i in range(12):
+            tokenizer_obj.tokenize('東京' * (i + 1))
+        info = cache.cache_info()
+        self.assertEqual(10, info.disk_currsize)
+        self.assertEqual(2, info.disk_evictions)
+        self.assertEqual(12, len(tokenizer_obj.tokenize('東京' * 12)))
+        self.assertEqual(1, cache.cache_info().disk_hits)
+        cache.close()
+
+    @unittest.skipUnless('fork' in multiprocessing.get_all_start_methods(), 'fork is not available')
+    def test_disk_shared_by_processes(self):
+        path = os.path.join(self.test_dir, 'results.db')
+        texts = ['東京' * (i + 1) for i in range(50)]
+        self.create_tokenizer(ResultCache(0, path, self.dict_.fingerprint()))
+
+        def tokenize(texts_):
+            # the cache is not closed, so every result must be committed by put
+            tokenizer_obj = self.dict_.create()
+            for _ in range(2):
+                for text in texts_:
+                    tokenizer_obj.tokenize(text)
+
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=tokenize, args=(texts[i::2] + texts[:10],)) for i in range(2)]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+        self.assertEqual([0, 0], [p.exitcode for p in processes])
+        self.dict_.result_cache.close()
+
+        cache = ResultCache(0, path, self.dict_.fingerprint())
+        tokenizer_obj = self.create_tokenizer(cache)
+        for text in texts:
+            tokenizer_obj.tokenize(text)
+        info = cache.cache_info()
+        self.assertEqual((0, 50, 0), info[:3])
+        self.assertEqual(50, info.disk_currsize)
+        cache.close()
+
+    def test_disk_shared_by_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+        texts = ['東京' * (i % 20 + 1) for i in range(200)]
+        expected = [self.to_tuples(self.dict_.create().tokenize(text)) for text in texts]
+        cache = ResultCache(0, os.path.join(self.test_dir, 'results.db'), self.dict_.fingerprint())
+        tokenizer_obj = self.create_tokenizer(cache)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda text: self.to_tuples(tokenizer_obj.tokenize(text)), texts))
+        self.assertEqual(expected, results)
+        info = cache.cache_info()
+        self.assertEqual(200, info.disk_hits + info.misses)
+        self.assertEqual(20, info.disk_currsize)
+        cache.close()
+
+    def test_disk_write_does_not_block_memory_hits(self):
+        path = os.path.join(self.test_dir, 'results.db')
+        with mock.patch.object(resultcache, '_BUSY_TIMEOUT', 5.0):
+            cache = ResultCache(10, path, self.dict_.fingerprint())
+        tokenizer_obj = self.create_tokenizer(cache)
+        tokenizer_obj.tokenize('東京都')
+
+        # another process holds the write lock of the database
+        blocker = sqlite3.connect(path, isolation_level=None)
+        blocker.execute('BEGIN IMMEDIATE')
+        writer = threading.Thread(target=tokenizer_obj.tokenize, args=('京都',))
+        writer.start()
+        time.sleep(0.2)
+        start = time.monotonic()
+        self.assertEqual(['東京都'], [m.surface() for m in tokenizer_obj.tokenize('東京都')])
+        self.assertLess(time.monotonic() - start, 1.0)
+        blocker.execute('COMMIT')
+        blocker.close()
+        writer.join()
+        self.assertEqual(2, cache.cache_info().disk_currsize)
+        cache.close()
+
+    def test_fingerprint(self):
+        resource_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources')
+        dict_ = Dictionary(os.path.join(resource_dir, 'sudachi.json'), resource_dir)
+        self.assertEqual(self.dict_.fingerprint(), dict_.fingerprint())
+        self.assertEqual(40, len(dict_.fingerprint()))
+
+    def test_disk_after_resource_file_changed(self):
+        resource_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources')
+        rewrite_def = os.path.join(self.test_dir, 'rewrite.def')
+        shutil.copyfile(os.path.join(resource_dir, 'rewrite.def'), rewrite_def)
+        config_path = os.path.join(self.test_dir, 'sudachi.json')
+        with open(config_path, 'w', encoding='utf-8') as wf:
+            json.dump({
+                'systemDict': os.path.join(resource_dir, 'system.dic'),
+                'characterDefinitionFile': os.path.join(resource_dir, 'char.def'),
+                'inputTextPlugin': [{'class': 'sudachipy.plugin.input_text.DefaultInputTextPlugin',
+                                     'rewriteDef': 'rewrite.def'}],
+                'oovProviderPlugin': [{'class': 'sudachipy.plugin.oov.SimpleOovProviderPlugin',
+                                       'oovPOS': ['名詞', '普通名詞', '一般', '*', '*', '*'],
+                                       'leftId': 8, 'rightId': 8, 'cost': 6000}],
+                'resultCachePath': 'results.db'}, wf)
+
+        dict_ = Dictionary(config_path)
+        self.assertEqual(['東京都'], [m.surface() for m in dict_.create().tokenize('東京都')])
+        dict_.result_cache.close()
+        with open(rewrite_def, 'a', encoding='utf-8') as wf:
+            wf.write('京\t兄\n')
+
+        dict_ = Dictionary(config_path)
+        ms = dict_.create().tokenize('東京都')
+        self.assertNotEqual(['東京都'], [m.surface() for m in ms])
+        info = dict_.result_cache.cache_info()
+        self.assertEqual((0, 0, 1), info[:3])
+        dict_.result_cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
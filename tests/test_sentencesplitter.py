@@ -0,0 +1,53 @@
+# Copyright (c) 2019 Works Applications Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from sudachipy.sentencesplitter import SentenceSplitter
+
+
+class TestSentenceSplitter(unittest.TestCase):
+
+    def split(self, text, max_length=100):
+        return [text[b:e] for b, e in SentenceSplitter(max_length).split(text)]
+
+    def test_split(self):
+        self.assertEqual(['東京都に行く。', '京都に行く！？', '大阪'], self.split('東京都に行く。京都に行く！？大阪'))
+        self.assertEqual(['東京都に行く\n', '京都'], self.split('東京都に行く\n京都'))
+        self.assertEqual([], self.split(''))
+
+    def test_split_with_brackets(self):
+        self.assertEqual(['「行く。行かない？」と言った。', '京都'], self.split('「行く。行かない？」と言った。京都'))
+        self.assertEqual(['行く。」 ', '京都'], self.split('行く。」 京都'))
+        self.assertEqual(['「行く\n', '京都。'], self.split('「行く\n京都。'))
+
+    def test_split_with_period(self):
+        self.assertEqual(['3.14です．e.g. 京都です．', '京都'], self.split('3.14です．e.g. 京都です．京都'))
+
+    def test_split_long_sentence(self):
+        self.assertEqual(['東京、', '京都、', '大阪'], self.split('東京、京都、大阪', 4))
+        self.assertEqual(['abcd', 'efgh', 'ij'], self.split('abcdefghij', 4))
+
+    def test_find_cut(self):
+        self.assertEqual(3, SentenceSplitter.find_cut('ab cd', 0, 4))
+        self.assertEqual(3, SentenceSplitter.find_cut('abce\u0301fg', 0, 4))
+        self.assertEqual(3, SentenceSplitter.find_cut('abce\u200dfg', 0, 4))
+
+    def test_invalid_max_length(self):
+        with self.assertRaises(ValueError):
+            SentenceSplitter(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
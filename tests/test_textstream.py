@@ -0,0 +1,50 @@
+# Copyright (c) 2019 Works Applications Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import unittest
+
+from sudachipy.textstream import split_lines
+
+
+class TestTextStream(unittest.TestCase):
+
+    def test_split_lines_of_file(self):
+        input_ = io.StringIO('東京都\n\n京都\n大阪')
+        self.assertEqual(['東京都', '', '京都', '大阪'], list(split_lines(input_)))
+
+    def test_split_lines_of_iterable(self):
+        self.assertEqual(['東京都', '京都', '', '大阪', '神戸'], list(split_lines(['東京都\n', '京都', '', '大阪\n神戸\n'])))
+
+    def test_split_long_line_at_sentence_end(self):
+        input_ = io.StringIO('東京。京都に行く\n大阪')
+        self.assertEqual(['東京。', '京都に行く', '大阪'], list(split_lines(input_, 6)))
+
+    def test_split_long_line_at_space(self):
+        self.assertEqual(['ab cd ', 'efgh'], list(split_lines(['ab cd efgh'], 7)))
+
+    def test_split_long_line_without_boundary(self):
+        self.assertEqual(['abcd', 'efgh', 'ij'], list(split_lines(io.StringIO('abcdefghij'), 4)))
+
+    def test_split_long_line_before_combining_mark(self):
+        self.assertEqual(['abc', 'e\u0301fg'], list(split_lines(['abce\u0301fg'], 4)))
+        self.assertEqual(['abc', 'e\u200dfg'], list(split_lines(['abce\u200dfg'], 4)))
+
+    def test_invalid_max_length(self):
+        with self.assertRaises(ValueError):
+            list(split_lines(['abc'], 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
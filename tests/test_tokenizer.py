@@ -104,6 +104,32 @@ class TestTokenizer(unittest.TestCase):
         self.assertEqual(ms_a[0].surface(), '東京')
         self.assertEqual(ms_a[1].surface(), '都')
 
+    def test_tokenize_modes(self):
+        from sudachipy import tokenizer
+        results = self.tokenizer_obj.tokenize_modes('東京都に行った')
+        self.assertEqual([['東京', '都', 'に', '行っ', 'た'], ['東京都', 'に', '行っ', 'た'], ['東京都', 'に', '行っ', 'た']],
+                         [[m.surface() for m in ms] for ms in results])
+        self.assertEqual([[0, 2, 3, 4, 6]], [[m.begin() for m in ms] for ms in results][:1])
+        results = self.tokenizer_obj.tokenize_modes('東京都', [tokenizer.Tokenizer.SplitMode.C, tokenizer.Tokenizer.SplitMode.A])
+        self.assertEqual([['東京都'], ['東京', '都']], [[m.surface() for m in ms] for ms in results])
+        self.assertEqual([0, 0, 0], [len(ms) for ms in self.tokenizer_obj.tokenize_modes('')])
+
+    def test_tokenize_multi(self):
+        units = self.tokenizer_obj.tokenize_multi('東京都に行った')
+        self.assertEqual(['東京都', 'に', '行っ', 'た'], [u.c.surface() for u in units])
+        self.assertEqual([['東京', '都'], ['東京都']], [[m.surface() for m in ms] for ms in (units[0].a, units[0].b)])
+        self.assertEqual([(0, 2), (2, 3)], [(m.begin(), m.end()) for m in units[0].a])
+        self.assertEqual(['に'], [m.surface() for m in units[1].a])
+        self.assertEqual([], self.tokenizer_obj.tokenize_multi(''))
+
+    def test_split_cache(self):
+        lexicon = self.dict_.lexicon
+        lexicon.split_cache.clear()
+        self.assertEqual(((5, 6), (9, 3)), lexicon.get_split(6, True))
+        self.assertEqual((), lexicon.get_split(5, True))
+        self.assertIs(lexicon.get_split(6, True), lexicon.get_split(6, True))
+        self.assertEqual(2, lexicon.split_cache.cache_info().hits)
+
     def test_tokenizer_morpheme_list_range(self):
         from sudachipy import tokenizer
         ms = self.tokenizer_obj.tokenize('東京都', tokenizer.Tokenizer.SplitMode.A)
@@ -118,6 +144,147 @@ class TestTokenizer(unittest.TestCase):
         with self.assertRaises(IndexError) as cm:
             ms[-3]
 
+    def test_tokenize_batch(self):
+        texts = ['京都', '', '東京都', 'ぴらる']
+        results = self.tokenizer_obj.tokenize_batch(texts)
+        self.assertEqual(len(texts), len(results))
+        for text, ms in zip(texts, results):
+            expected = self.tokenizer_obj.tokenize(text)
+            self.assertEqual([m.surface() for m in expected], [m.surface() for m in ms])
+            self.assertEqual([m.part_of_speech() for m in expected], [m.part_of_speech() for m in ms])
+
+    def test_tokenize_batch_with_mode(self):
+        from sudachipy import tokenizer
+        results = self.tokenizer_obj.tokenize_batch(['東京都', '東京都'], tokenizer.Tokenizer.SplitMode.A)
+        for ms in results:
+            self.assertEqual(['東京', '都'], [m.surface() for m in ms])
+
+    def test_tokenize_iter(self):
+        it = self.tokenizer_obj.tokenize_iter(iter(['京都', '東京府']))
+        self.assertEqual('京都', next(it)[0].surface())
+        self.assertEqual('東京府', next(it)[0].surface())
+        with self.assertRaises(StopIteration):
+            next(it)
+
+    def test_tokenize_stream(self):
+        import io
+        results = list(self.tokenizer_obj.tokenize_stream(io.StringIO('京都\n\n東京都' + 'ぴらる' * 4)))
+        self.assertEqual(['京都'], [m.surface() for m in results[0]])
+        self.assertEqual(0, len(results[1]))
+        self.assertEqual(['東京都'] + ['ぴらる'] * 4, [m.surface() for m in results[2]])
+
+        results = list(self.tokenizer_obj.tokenize_stream(['東京都' + 'ぴらる' * 4], max_length=9))
+        self.assertEqual(['東京都', 'ぴらる', 'ぴらる'], [m.surface() for m in results[0]])
+        self.assertEqual(['ぴらる', 'ぴらる'], [m.surface() for m in results[1]])
+
+    def test_tokenize_nbest(self):
+        results = self.tokenizer_obj.tokenize_nbest('東京都', 3)
+        self.assertEqual(3, len(results))
+        self.assertEqual([m.surface() for m in self.tokenizer_obj.tokenize('東京都')],
+                         [m.surface() for m in results[0]])
+        paths = [tuple((m.begin(), m.end(), m.word_id()) for m in ms) for ms in results]
+        self.assertEqual(len(paths), len(set(paths)))
+        self.assertIn(((0, 2, 5), (2, 3, 9)), paths)
+
+    def test_tokenize_nbest_all_paths(self):
+        from sudachipy import tokenizer
+        results = self.tokenizer_obj.tokenize_nbest('東京都', 100)
+        self.assertEqual([['東京都'], ['東京', '都'], ['東', '京都']], [[m.surface() for m in ms] for ms in results])
+        results = self.tokenizer_obj.tokenize_nbest('東京都', 2, tokenizer.Tokenizer.SplitMode.A)
+        self.assertEqual(['東京', '都'], [m.surface() for m in results[0]])
+        self.assertEqual(1, len(self.tokenizer_obj.tokenize_nbest('', 2)))
+        with self.assertRaises(ValueError):
+            self.tokenizer_obj.tokenize_nbest('東京都', 0)
+
+    def test_tokenize_keeps_previous_results(self):
+        ms = self.tokenizer_obj.tokenize('東京都に行った')
+        results = self.tokenizer_obj.tokenize_nbest('京都', 2)
+        self.tokenizer_obj.tokenize('行くぴらる東')
+        self.assertEqual(['東京都', 'に', '行っ', 'た'], [m.surface() for m in ms])
+        self.assertEqual([6, 8], [m.word_id() for m in ms][::2])
+        self.assertEqual([0, 4], [m.begin() for m in ms][::2])
+        self.assertEqual(['京都'], [m.surface() for m in results[0]])
+        self.assertEqual([3], [m.word_id() for m in results[0]])
+
+    def test_tokenize_sentences(self):
+        from sudachipy import tokenizer
+        text = '東京都に行った。京都ぴらる'
+        results = list(self.tokenizer_obj.tokenize_sentences(text))
+        self.assertEqual(2, len(results))
+        self.assertEqual(['東京都', 'に', '行っ', 'た', '。'], [m.surface() for m in results[0]])
+        ms = results[1]
+        self.assertEqual(['京都', 'ぴらる'], [m.surface() for m in ms])
+        self.assertEqual([8, 10], [m.begin() for m in ms])
+        self.assertEqual([10, 13], [m.end() for m in ms])
+        self.assertEqual([8, 10], list(ms.to_arrays().begin))
+
+        ms = list(self.tokenizer_obj.tokenize_sentences('京都。東京都', tokenizer.Tokenizer.SplitMode.A))[1]
+        self.assertEqual(['東京', '都'], [m.surface() for m in ms])
+        self.assertEqual([3, 5], [m.begin() for m in ms])
+
+    def test_tokenize_sentences_with_max_length(self):
+        text = '東京都' + 'ぴらる' * 3
+        results = list(self.tokenizer_obj.tokenize_sentences(text, max_length=6))
+        self.assertEqual([['東京都', 'ぴらる'], ['ぴらる', 'ぴらる']], [[m.surface() for m in ms] for ms in results])
+        self.assertEqual([[0, 3], [6, 9]], [[m.begin() for m in ms] for ms in results])
+
+    def test_tokenize_in_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+        texts = ['東京都', '京都', 'ぴらる', '東京府', '特ab', '京都…'] * 50
+        expected = [[(m.surface(), m.begin(), m.end(), m.part_of_speech_id()) for m in self.tokenizer_obj.tokenize(t)]
+                    for t in texts]
+
+        def run(text):
+            return [(m.surface(), m.begin(), m.end(), m.part_of_speech_id()) for m in self.tokenizer_obj.tokenize(text)]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(run, texts))
+        self.assertEqual(expected, results)
+
+    def test_tokenize_arrays(self):
+        text = '東京都ぴらるザーチ'
+        arrays = self.tokenizer_obj.tokenize_arrays(text)
+        ms = self.tokenizer_obj.tokenize(text)
+        self.assertEqual([m.begin() for m in ms], list(arrays.begin))
+        self.assertEqual([m.end() for m in ms], list(arrays.end))
+        self.assertEqual([m.word_id() for m in ms], list(arrays.word_id))
+        self.assertEqual([m.part_of_speech_id() for m in ms], list(arrays.part_of_speech_id))
+        self.assertEqual([m.dictionary_id() for m in ms], list(arrays.dictionary_id))
+        self.assertEqual([0, 1, -1], list(arrays.dictionary_id))
+        self.assertEqual([0, 0, 1], list(arrays.is_oov))
+
+    def test_tokenize_arrays_with_mode(self):
+        from sudachipy import tokenizer
+        arrays = self.tokenizer_obj.tokenize_arrays('東京都', tokenizer.Tokenizer.SplitMode.A)
+        self.assertEqual([0, 2], list(arrays.begin))
+        self.assertEqual([2, 3], list(arrays.end))
+        self.assertEqual(0, len(self.tokenizer_obj.tokenize_arrays('').begin))
+
+    def test_to_arrays_with_large_dictionary_id(self):
+        from unittest import mock
+        from sudachipy import latticenode
+        from sudachipy.morphemelist import MorphemeList
+        ms = self.tokenizer_obj.tokenize('京都')
+        word_id = 8 << 28 | ms[0].word_id()
+        lexicon = mock.Mock()
+        lexicon.get_dictionary_id.side_effect = lambda wid: wid >> 28
+        lexicon.get_word_info.return_value = ms[0].get_word_info()
+        node = latticenode.LatticeNode(lexicon, 0, 0, 0, word_id)
+        node.set_range(0, 6)
+        arrays = MorphemeList(ms.input_text, ms.grammar, lexicon, [node]).to_arrays()
+        self.assertEqual([word_id], list(arrays.word_id))
+        self.assertEqual([8], list(arrays.dictionary_id))
+        self.assertEqual([0], list(arrays.is_oov))
+
+    def test_tokenize_arrays_as_numpy(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest('numpy is not installed')
+        arrays = self.tokenizer_obj.tokenize_arrays('東京都ぴらる', as_numpy=True)
+        self.assertIsInstance(arrays.begin, numpy.ndarray)
+        self.assertEqual([0, 3], arrays.begin.tolist())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import os
+import random
 import unittest
 
 import sudachipy
@@ -88,6 +89,33 @@ class TestUTF8InputText(unittest.TestCase):
         self.assertTrue(dictionarylib.categorytype.CategoryType.KATAKANA in input_.get_char_category_types(26))
         self.assertTrue(dictionarylib.categorytype.CategoryType.KATAKANA in input_.get_char_category_types(31))
 
+    def test_get_char_category_mask(self):
+        input_ = self.builder.build()
+        self.assertTrue(input_.get_char_category_mask(0) & dictionarylib.categorytype.CategoryType.ALPHA.value)
+        self.assertTrue(input_.get_char_category_mask(6) & dictionarylib.categorytype.CategoryType.NUMERIC.value)
+        self.assertTrue(input_.get_char_category_mask(19) & dictionarylib.categorytype.CategoryType.DEFAULT.value)
+        self.assertTrue(input_.get_char_category_mask(0, 6) & dictionarylib.categorytype.CategoryType.ALPHA.value)
+        self.assertTrue(input_.get_char_category_mask(13, 19) & dictionarylib.categorytype.CategoryType.KANJI.value)
+        self.assertEqual(0, input_.get_char_category_mask(0, 7))
+        self.assertEqual(dictionarylib.categorytype.CategoryType.from_mask(input_.get_char_category_mask(13)),
+                         input_.get_char_category_types(13))
+
+    def test_char_categories(self):
+        input_ = self.builder.build()
+        categories = input_.char_categories
+        self.assertEqual(len(input_.char_category_masks), len(categories))
+        self.assertTrue(dictionarylib.categorytype.CategoryType.KANJI in categories[8])
+
+        args = (None, input_.original_text, input_.modified_text, input_.bytes, input_.offsets, input_.byte_indexes)
+        by_keyword = sudachipy.utf8inputtext.UTF8InputText(
+            *args, char_categories=categories, char_category_continuities=input_.char_category_continuities,
+            can_bow_list=input_.can_bow_list)
+        self.assertEqual(input_.char_category_masks, by_keyword.char_category_masks)
+        by_position = sudachipy.utf8inputtext.UTF8InputText(
+            *args, [set(types) for types in categories], input_.char_category_continuities, input_.can_bow_list)
+        self.assertEqual(input_.char_category_masks, by_position.char_category_masks)
+        self.assertEqual(input_.get_char_category_types(13, 19), by_position.get_char_category_types(13, 19))
+
     def test_get_char_category_continuous_length(self):
         input_ = self.builder.build()
         self.assertEqual(input_.get_char_category_continuous_length(0), 6)
@@ -105,6 +133,14 @@ class TestUTF8InputText(unittest.TestCase):
         self.assertEqual(input_.get_char_category_continuous_length(26), 6)
         self.assertEqual(input_.get_char_category_continuous_length(31), 1)
 
+    def test_builder_char_category_continuities(self):
+        input_ = self.builder.build()
+        categories = self.builder.get_char_category_types(self.TEXT)
+        self.assertEqual(input_.char_category_continuities,
+                         self.builder.get_char_category_continuities(self.TEXT, 32, categories))
+        self.assertEqual(3, self.builder.get_char_category_continuous_length(categories, 0))
+        self.assertEqual(3, self.builder.get_char_category_continuous_length(categories, 5))
+
     def test_replace_with_same_length(self):
         self.builder.replace(8, 10, "ああ")
         self.assertEqual(self.builder.get_original_text(), self.TEXT)
@@ -155,6 +191,34 @@ class TestUTF8InputText(unittest.TestCase):
         self.assertEqual(input_.get_original_index(25), 10)  # 𡈽
         self.assertEqual(input_.get_original_index(35), 14)  #  ﾞ
 
+    def test_replace_with_edit_log(self):
+        def replace_one_by_one(text, offsets, begin, end, str_):
+            end = min(end, len(text))
+            begin_offset, end_offset = offsets[begin], offsets[end]
+            offsets[begin:end] = [begin_offset] + [end_offset] * (len(str_) - 1) if str_ else []
+            if not str_:
+                offsets[begin] = begin_offset
+            return text[:begin] + str_ + text[end:]
+
+        rand = random.Random(0)
+        for _ in range(500):
+            builder = sudachipy.utf8inputtextbuilder.UTF8InputTextBuilder(self.TEXT, self.builder.grammar)
+            text = self.TEXT
+            offsets = list(range(len(text) + 1))
+            begin = 0
+            for _ in range(rand.randint(1, 8)):
+                if not text:
+                    break
+                if rand.random() < 0.2 or begin >= len(text):
+                    begin = rand.randrange(len(text))  # goes back
+                end = rand.randint(begin + 1, len(text) + 1)
+                str_ = 'xyz'[:rand.randint(0, 3)]
+                builder.replace(begin, end, str_)
+                text = replace_one_by_one(text, offsets, begin, end, str_)
+                begin += len(str_) + rand.randint(0, 2)
+            self.assertEqual(text, builder.get_text())
+            self.assertEqual(offsets, builder.modified_to_original)
+
     def test_replaceMultiTimes(self):
         self.builder.replace(0, 1, "a")
         self.builder.replace(1, 2, "b")